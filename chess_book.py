@@ -0,0 +1,163 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program builds and reads an opening book of moves played in recorded games
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from chess_var import ChessVar, SQUARE_NAMES, SQUARE_LOOKUP
+from chess_records import read_games
+
+# A book file starts with a header (MAGIC and the number of entries) followed by fixed-size entries sorted by
+# position hash and then move. An entry holds the hash of the position before the move, the move as
+# (from square << 6) | to square, how many games played it from that position, and how many of those
+# white and black went on to win.
+MAGIC = b'KOTHBOOK'
+HEADER = struct.Struct('<8sQ')
+ENTRY = struct.Struct('<QHxxIII')
+KEY = struct.Struct('<Q')
+
+BookMove = namedtuple('BookMove', ['move_from', 'move_to', 'games', 'white_wins', 'black_wins'])
+BookMove.__doc__ = """
+A move found in the opening book: the move as two string coordinates, how many recorded games played it
+from the position, and how many of those games white and black went on to win.
+"""
+
+
+def build_book(book_path, record_path, max_plies=10, backend='array'):
+    """
+    Receives the path of the book file to write, the path of a game record file (see chess_records),
+    how many moves into each game to look and an optional ChessVar backend name.
+    Replays the first max_plies moves of every game through move_made, stopping at an illegal move, counts each
+    move played from each position with the game's result, and writes the book, replacing any existing file.
+    Returns the number of entries written.
+    """
+    game = ChessVar(backend=backend)
+    counts = {}             # (position hash, move) -> [games, white wins, black wins]
+
+    for record in read_games(record_path):
+        game.reset()
+        white_won = record.game_state == 'WHITE_WON'
+        black_won = record.game_state == 'BLACK_WON'
+
+        for move_from, move_to in record.moves[:max_plies]:
+            key = game.position_hash()
+            if not game.move_made(move_from, move_to):
+                break
+
+            entry_key = (key, SQUARE_LOOKUP[move_from] << 6 | SQUARE_LOOKUP[move_to])
+            entry = counts.get(entry_key)
+            if entry is None:
+                entry = counts[entry_key] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += white_won
+            entry[2] += black_won
+
+    with open(book_path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, len(counts)))
+        for key, move in sorted(counts):
+            book_file.write(ENTRY.pack(key, move, *counts[key, move]))
+
+    return len(counts)
+
+
+class OpeningBook:
+    """
+    Represents an opening book file opened for probing. The file is memory-mapped and searched by bisection,
+    so a probe reads only the few entries it compares.
+    Can be used in a with statement, which closes it.
+    """
+    def __init__(self, path):
+        """
+        Initializes a book for the file at path. Raises ValueError if the file is not a book file.
+        """
+        size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        self._map = None
+        self._count = 0
+
+        if size >= HEADER.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = HEADER.unpack_from(self._map, 0)
+
+        if self._map is None or magic != MAGIC or size != HEADER.size + self._count * ENTRY.size:
+            self.close()
+            raise ValueError('not an opening book file: %s' % path)
+
+    def get_count(self):
+        """
+        Returns the number of entries (position and move pairs) in the book.
+        """
+        return self._count
+
+    def probe(self, game):
+        """
+        Receives a ChessVar object. Returns a list of BookMoves for its position, most played first,
+        or an empty list if the position is not in the book.
+        """
+        key = game.position_hash()
+        data = self._map
+
+        # first entry whose key is not less than the position's
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) >> 1
+            if KEY.unpack_from(data, HEADER.size + middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for offset in range(HEADER.size + low * ENTRY.size, HEADER.size + self._count * ENTRY.size, ENTRY.size):
+            entry_key, move, games, white_wins, black_wins = ENTRY.unpack_from(data, offset)
+            if entry_key != key:
+                break
+            moves.append(BookMove(SQUARE_NAMES[move >> 6], SQUARE_NAMES[move & 63], games, white_wins, black_wins))
+
+        moves.sort(key=lambda book_move: -book_move.games)
+        return moves
+
+    def choose_move(self, game, min_games=1):
+        """
+        Receives a ChessVar object and the number of games a move needs to have been played in to be trusted.
+        Returns the (move from, move to) tuple of the most played book move that is legal in the position,
+        preferring the one that scored best for the player to move when two were played equally often.
+        Returns None if the book has no such move.
+        """
+        legal = set(game.legal_moves())
+        best_move = None
+        best_rank = None
+
+        for book_move in self.probe(game):
+            move = (book_move.move_from, book_move.move_to)
+            if book_move.games < min_games or move not in legal:
+                continue
+
+            if game._current_color == 'white':
+                wins = book_move.white_wins - book_move.black_wins
+            else:
+                wins = book_move.black_wins - book_move.white_wins
+
+            rank = (book_move.games, wins)
+            if best_rank is None or rank > best_rank:
+                best_move = move
+                best_rank = rank
+
+        return best_move
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+        """
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
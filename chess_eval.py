@@ -0,0 +1,194 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program scores many "King of the Hill" positions at once with NumPy (optional dependency)
+
+from chess_var import EMPTY, PAWN, ROOK, KNIGHT, BISHOP, QUEEN, KING, WHITE, BLACK, DIRECTIONS, ROOK_DIRECTIONS
+from chess_search import PIECE_VALUES, HILL_DISTANCE, KING_HILL_BONUS
+
+try:
+    import numpy as np
+except ImportError:         # the rest of the project works without NumPy; only this module needs it
+    np = None
+
+# rows evaluated together, to keep the temporary arrays small
+CHUNK_SIZE = 1 << 16
+MOBILITY_CHUNK_SIZE = 1 << 10
+
+# The move counts use a 12 x 12 "mailbox" copy of the board: the 8 x 8 squares sit inside a border two cells
+# wide (enough for a knight's jump) of OFF_BOARD cells, so every move is a fixed offset between cells.
+OFF_BOARD = -1
+MAILBOX_SQUARES = tuple((square >> 3) * 12 + (square & 7) + 26 for square in range(64))
+KNIGHT_OFFSETS = tuple(row_step * 12 + col_step for row_step, col_step in
+                       ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)))
+KING_OFFSETS = tuple(row_step * 12 + col_step for row_step, col_step in DIRECTIONS)
+RAY_OFFSETS = KING_OFFSETS
+PAWN_FORWARD_OFFSETS = (-12, 12)
+PAWN_CAPTURE_OFFSETS = ((-13, -11), (11, 13))
+
+# piece codes of the twelve one-hot planes: white pawn ... white king, then black pawn ... black king
+PLANE_CODES = tuple(WHITE | piece_type for piece_type in range(PAWN, KING + 1)) + \
+              tuple(BLACK | piece_type for piece_type in range(PAWN, KING + 1))
+
+
+if np is not None:
+    # score of each piece code on each square, white positive: material, plus the hill bonus for kings
+    SQUARE_WEIGHTS = np.zeros((16, 64), dtype=np.int32)
+    for _piece_type in range(PAWN, KING + 1):
+        SQUARE_WEIGHTS[WHITE | _piece_type] = PIECE_VALUES[_piece_type]
+        SQUARE_WEIGHTS[BLACK | _piece_type] = -PIECE_VALUES[_piece_type]
+    SQUARE_WEIGHTS[WHITE | KING] += [KING_HILL_BONUS[HILL_DISTANCE[square]] for square in range(64)]
+    SQUARE_WEIGHTS[BLACK | KING] -= [KING_HILL_BONUS[HILL_DISTANCE[square]] for square in range(64)]
+    SQUARE_WEIGHTS = SQUARE_WEIGHTS.ravel()
+    SQUARE_RANGE = np.arange(64, dtype=np.int16)
+
+    # cells of each color's pawns that may still move two squares
+    PAWN_START_CELLS = np.zeros((2, 144), dtype=bool)
+    PAWN_START_CELLS[0, [MAILBOX_SQUARES[square] for square in range(48, 56)]] = True
+    PAWN_START_CELLS[1, [MAILBOX_SQUARES[square] for square in range(8, 16)]] = True
+    PLANE_CODE_ARRAY = np.array(PLANE_CODES, dtype=np.int8).reshape(1, 12, 1)
+
+
+def _require_numpy():
+    """
+    Helper function: raises ImportError if NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError('chess_eval needs NumPy (pip install numpy)')
+
+
+def pack_positions(games):
+    """
+    Receives a sequence of ChessVar objects.
+    Returns a (squares, black_to_move) pair: an (N, 64) int8 array of piece codes in square order (see SQUARE_NAMES)
+    and an (N,) boolean array that is True where black is to move.
+    """
+    _require_numpy()
+    squares = np.frombuffer(b''.join(bytes(game._squares) for game in games), dtype=np.int8).reshape(-1, 64)
+    black_to_move = np.fromiter((game._current_color == 'black' for game in games), dtype=bool, count=len(games))
+    return squares, black_to_move
+
+
+def one_hot_planes(squares):
+    """
+    Receives an (N, 64) array of piece codes.
+    Returns an (N, 12, 64) int8 array with a 1 where each plane's piece (see PLANE_CODES) stands.
+    """
+    _require_numpy()
+    return (np.asarray(squares, dtype=np.int8)[:, np.newaxis, :] == PLANE_CODE_ARRAY).astype(np.int8)
+
+
+def evaluate_batch(squares, black_to_move, mobility_weight=0):
+    """
+    Receives an (N, 64) array of piece codes, an (N,) boolean array that is True where black is to move,
+    and an optional weight for the difference in move counts (see mobility_batch).
+    Returns an (N,) int32 array of scores for the player to move. With no mobility weight each score equals
+    chess_search.evaluate for the position.
+    """
+    _require_numpy()
+    squares = np.asarray(squares, dtype=np.int8)
+    scores = np.empty(len(squares), dtype=np.int32)
+
+    for start in range(0, len(squares), CHUNK_SIZE):
+        chunk = squares[start:start + CHUNK_SIZE]
+        indexes = chunk.astype(np.int16) * 64 + SQUARE_RANGE
+        scores[start:start + CHUNK_SIZE] = SQUARE_WEIGHTS[indexes].sum(axis=1, dtype=np.int32)
+
+    if mobility_weight:
+        white_moves, black_moves = mobility_batch(squares)
+        scores += mobility_weight * (white_moves - black_moves)
+
+    return np.where(np.asarray(black_to_move, dtype=bool), -scores, scores).astype(np.int32)
+
+
+def evaluate_games(games, mobility_weight=0):
+    """
+    Receives a sequence of ChessVar objects and an optional mobility weight.
+    Returns an (N,) int32 array of their scores for the player to move (see evaluate_batch).
+    """
+    squares, black_to_move = pack_positions(games)
+    return evaluate_batch(squares, black_to_move, mobility_weight)
+
+
+def mobility_batch(squares):
+    """
+    Receives an (N, 64) array of piece codes.
+    Returns a (white moves, black moves) pair of (N,) int32 arrays: how many moves each side's pieces could make
+    under the variant's rules, whichever player is to move. For the player to move this equals the number
+    of legal moves while the game is unfinished.
+    """
+    _require_numpy()
+    squares = np.asarray(squares, dtype=np.int8)
+    white_moves = np.empty(len(squares), dtype=np.int32)
+    black_moves = np.empty(len(squares), dtype=np.int32)
+
+    for start in range(0, len(squares), MOBILITY_CHUNK_SIZE):
+        chunk = squares[start:start + MOBILITY_CHUNK_SIZE]
+        mailbox = np.full((len(chunk), 144), OFF_BOARD, dtype=np.int8)
+        mailbox[:, MAILBOX_SQUARES] = chunk
+        white_moves[start:start + MOBILITY_CHUNK_SIZE] = _count_moves(mailbox, 0)
+        black_moves[start:start + MOBILITY_CHUNK_SIZE] = _count_moves(mailbox, 1)
+
+    return white_moves, black_moves
+
+
+def _reach(cells, offset, allowed):
+    """
+    Helper function for _count_moves. Receives an (N, 144) boolean array of mailbox cells, a mailbox offset
+    and an (N, 144) boolean array of cells that may be moved to.
+    Returns a boolean array of the cells offset away from a True cell that are allowed.
+    """
+    reached = np.zeros_like(cells)
+    if offset > 0:
+        np.logical_and(cells[:, :-offset], allowed[:, offset:], out=reached[:, offset:])
+    else:
+        np.logical_and(cells[:, -offset:], allowed[:, :offset], out=reached[:, :offset])
+    return reached
+
+
+def _count_moves(mailbox, color_index):
+    """
+    Helper function for mobility_batch. Receives a chunk of boards in mailbox form and a color index
+    (0 white, 1 black). Returns the number of moves that color's pieces could make on each board.
+    Each piece's moves are found by shifting a mask of the pieces onto their target cells.
+    """
+    empty = mailbox == EMPTY
+    if color_index == 0:
+        own = (mailbox > EMPTY) & (mailbox < BLACK)
+        enemy = mailbox >= BLACK
+    else:
+        own = mailbox >= BLACK
+        enemy = (mailbox > EMPTY) & (mailbox < BLACK)
+    open_cells = empty | enemy
+
+    piece_types = np.where(own, mailbox & 7, 0)
+    moves = np.zeros(mailbox.shape, dtype=np.int8)     # moves counted on their target cells
+
+    # knights and kings: any target cell that is empty or holds an enemy piece
+    for piece_type, offsets in ((KNIGHT, KNIGHT_OFFSETS), (KING, KING_OFFSETS)):
+        movers = piece_types == piece_type
+        if movers.any():
+            for offset in offsets:
+                moves += _reach(movers, offset, open_cells)
+
+    # rooks, bishops and queens: move each ray's front outward one cell at a time until it is blocked
+    queens = piece_types == QUEEN
+    for direction, offset in enumerate(RAY_OFFSETS):
+        slider = ROOK if direction in ROOK_DIRECTIONS else BISHOP
+        front = queens | (piece_types == slider)
+        while front.any():
+            reached = _reach(front, offset, open_cells)
+            moves += reached
+            front = reached & empty
+
+    # pawns: one cell forward onto an empty or enemy cell, two forward from the starting row over
+    # empty cells, and diagonally forward only to capture
+    pawns = piece_types == PAWN
+    if pawns.any():
+        forward = PAWN_FORWARD_OFFSETS[color_index]
+        moves += _reach(pawns, forward, open_cells)
+        first_step = _reach(pawns & PAWN_START_CELLS[color_index], forward, empty)
+        moves += _reach(first_step, forward, empty)
+        for offset in PAWN_CAPTURE_OFFSETS[color_index]:
+            moves += _reach(pawns, offset, enemy)
+
+    return moves.sum(axis=1, dtype=np.int32)
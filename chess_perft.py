@@ -0,0 +1,173 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program counts move sequences (perft) to benchmark and cross-check the move rules
+
+import sys
+import time
+
+from chess_var import ChessVar, SQUARE_NAMES, EMPTY, PAWN, KNIGHT, BLACK, COLOR_BITS
+
+# test positions: name, position string for ChessVar.from_fen, and perft counts for depths 1, 2, 3, ...
+# The counts were produced by trying every square pair with ChessPiece.legal_move and reference_path_clear
+# (the original move_made checks, stepping square by square) and agree with both backends.
+PERFT_POSITIONS = [
+    ('opening', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w UNFINISHED',
+     [20, 400, 8910, 198347, 4928139]),
+    ('open centre', 'rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w UNFINISHED',
+     [31, 894, 28377, 851701, 27881130]),
+    ('queens out', 'r1b1kbnr/pppp1ppp/2n5/4p2Q/4P2q/5N2/PPPP1PPP/RNB1KB1R w UNFINISHED',
+     [36, 1458, 55369, 2169933, 84508063]),
+    ('kings advance', 'rnbq1bnr/ppp1pppp/3k4/3p4/4P3/4K3/PPPP1PPP/RNBQ1BNR w UNFINISHED',
+     [36, 1150, 39494, 1260610, 43219066]),
+    ('open files', 'rnbqkb2/ppppppp1/3r1n2/7p/P7/2N1R3/1PPPPPPP/2BQKBNR w UNFINISHED',
+     [26, 669, 17732, 468836, 12932692]),
+]
+
+
+def reference_path_clear(squares, start_square, end_square):
+    """
+    Receives a sequence of 64 piece codes and two square numbers for a move the piece may make (see
+    ChessPiece.legal_move). Returns True if the path is clear. Returns False otherwise.
+    Steps through the squares in between one at a time, as the original ChessVar.path_clear did, rather than
+    using the BETWEEN table both backends rely on, so it can check them. Slow; for cross-checking.
+    """
+    code = squares[start_square]
+
+    # knights jump over pieces, so path is always clear
+    if code & 7 == KNIGHT:
+        return True
+
+    start_row, start_col = start_square >> 3, start_square & 7
+    vertical_distance = (end_square >> 3) - start_row
+    horizontal_distance = (end_square & 7) - start_col
+
+    # if moving only one space: a pawn moving diagonally needs a piece to capture
+    if abs(vertical_distance) <= 1 and abs(horizontal_distance) <= 1:
+        if code & 7 == PAWN and abs(horizontal_distance) == 1:
+            return squares[end_square] != EMPTY
+        return True
+
+    row_step = (vertical_distance > 0) - (vertical_distance < 0)
+    col_step = (horizontal_distance > 0) - (horizontal_distance < 0)
+    steps = max(abs(vertical_distance), abs(horizontal_distance)) - 1
+
+    # exception: pawns can move 2 spaces on first move but NOT to capture, so the end square is checked too
+    if code & 7 == PAWN:
+        steps += 1
+
+    checking_row, checking_col = start_row, start_col
+    for step in range(steps):
+        checking_row += row_step    # move to next position to check
+        checking_col += col_step
+
+        # path not clear
+        if squares[checking_row * 8 + checking_col] != EMPTY:
+            return False
+
+    # path clear!
+    return True
+
+
+def reference_moves(game):
+    """
+    Receives a ChessVar object.
+    Returns the set of (from square, to square) number tuples that pass move_made's original checks, found by
+    trying every pair of squares with ChessPiece.legal_move and reference_path_clear. Slow; for cross-checking.
+    """
+    moves = set()
+    if game.get_game_state() != 'UNFINISHED':
+        return moves
+
+    squares = game._squares
+    color_bit = COLOR_BITS[game._current_color]
+
+    for from_square in range(64):
+        code = squares[from_square]
+        if code == EMPTY or code & BLACK != color_bit:
+            continue
+
+        piece = game._pieces[code]
+        move_from = (from_square >> 3, from_square & 7)
+
+        for to_square in range(64):
+            target = squares[to_square]
+            if to_square == from_square or (target != EMPTY and target & BLACK == color_bit):
+                continue
+
+            move_to = (to_square >> 3, to_square & 7)
+            if piece.legal_move(move_from, move_to) and reference_path_clear(squares, from_square, to_square):
+                moves.add((from_square, to_square))
+
+    return moves
+
+
+def cross_check(fen, depth, backend='bitboard'):
+    """
+    Receives a position string (see ChessVar.from_fen), a depth and a backend name.
+    Walks every move sequence up to the depth with that backend and compares the generated moves at each
+    position with reference_moves. Returns a list of (move path, missing moves, extra moves) for each position
+    where they differ; an empty list means the backend agrees with the reference everywhere.
+    """
+    game = ChessVar.from_fen(fen, backend)
+    mismatches = []
+    path = []
+
+    def walk(remaining):
+        generated = set(game._generate_moves())
+        expected = reference_moves(game)
+
+        if generated != expected:
+            mismatches.append((
+                [(SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]) for move in path],
+                sorted((SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]) for move in expected - generated),
+                sorted((SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]) for move in generated - expected),
+            ))
+
+        if remaining > 0:
+            for move in sorted(generated):
+                game._make(move[0], move[1])
+                path.append(move)
+                walk(remaining - 1)
+                path.pop()
+                game._unmake()
+
+    walk(depth)
+    return mismatches
+
+
+def timed_perft(fen, depth, backend='array'):
+    """
+    Receives a position string (see ChessVar.from_fen), a depth and a backend name.
+    Returns a (node count, seconds, nodes per second) tuple for ChessVar.perft at that depth.
+    """
+    game = ChessVar.from_fen(fen, backend)
+    start = time.perf_counter()
+    nodes = game.perft(depth)
+    seconds = time.perf_counter() - start
+    return nodes, seconds, nodes / seconds if seconds > 0 else float('inf')
+
+
+def run_suite(max_depth=3, backends=('array', 'bitboard'), output=sys.stdout):
+    """
+    Runs perft on every test position up to max_depth with each backend, printing the node count,
+    speed and whether it matches the reference count.
+    Returns True if every count matched. Returns False otherwise.
+    """
+    all_match = True
+
+    for name, fen, counts in PERFT_POSITIONS:
+        for depth in range(1, min(max_depth, len(counts)) + 1):
+            for backend in backends:
+                nodes, seconds, speed = timed_perft(fen, depth, backend)
+                match = nodes == counts[depth - 1]
+                all_match = all_match and match
+
+                print('%-14s depth %d  %-8s %10d nodes  %8.3f s  %10.0f nodes/s  %s'
+                      % (name, depth, backend, nodes, seconds, speed, 'ok' if match else 'MISMATCH'), file=output)
+
+    return all_match
+
+
+if __name__ == '__main__':
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sys.exit(0 if run_suite(depth) else 1)
@@ -0,0 +1,241 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program keeps an on-disk table of positions seen in recorded games and how those games ended
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from chess_var import ChessVar, GAME_STATES
+from chess_records import read_games
+
+# A position file starts with a header (MAGIC, the number of slots, the number of positions stored) followed by
+# a hash table of fixed-size slots. A slot holds the position hash, the board packed two squares per byte
+# (ChessVar._packed_squares), the color to move (0 white, 1 black), the game state number from GAME_STATES,
+# and the number of games that reached the position and how many of them white and black won.
+# A slot with a game count of 0 is empty. Collisions go to the next slot (linear probing).
+MAGIC = b'KOTHPOS\x01'
+HEADER = struct.Struct('<8sQQ')
+SLOT = struct.Struct('<Q32sBBxxIII')
+COUNTERS = struct.Struct('<III')
+COUNTERS_OFFSET = 44                # offset of the counters within a slot
+
+# the table is doubled when it would become fuller than this
+MAX_LOAD = 0.7
+
+PositionStats = namedtuple('PositionStats', ['games', 'white_wins', 'black_wins'])
+PositionStats.__doc__ = """
+What happened in the recorded games that reached a position: how many games did, and how many of those
+white and black went on to win.
+"""
+
+
+class PositionStore:
+    """
+    Represents a file of positions with game statistics, memory-mapped and indexed by position hash.
+    Lookups read the mapped file directly, so only the slots probed are ever loaded from disk.
+    Can be used in a with statement, which closes it.
+    """
+    def __init__(self, path, capacity=1 << 16):
+        """
+        Initializes a store for the file at path, creating it with room for capacity positions
+        (rounded up to a power of two) if it does not exist. Raises ValueError if the file is not a position file.
+        """
+        self._path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            slots = 1
+            while slots * MAX_LOAD < capacity:
+                slots *= 2
+            _create_file(path, slots)
+
+        self._open()
+
+    def _open(self):
+        """
+        Helper method: opens and maps the file and reads its header.
+        """
+        self._file = open(self._path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+        magic, self._slots, self._count = b'', 0, 0
+        if len(self._map) >= HEADER.size:
+            magic, self._slots, self._count = HEADER.unpack_from(self._map, 0)
+        # probing wraps around with a mask, so the slot count must be a power of two
+        if (magic != MAGIC or self._slots == 0 or self._slots & (self._slots - 1)
+                or len(self._map) != HEADER.size + self._slots * SLOT.size):
+            self.close()
+            raise ValueError('not a position file: %s' % self._path)
+        self._mask = self._slots - 1
+
+    def get_count(self):
+        """
+        Returns the number of positions stored.
+        """
+        return self._count
+
+    def get_capacity(self):
+        """
+        Returns the number of slots in the table.
+        """
+        return self._slots
+
+    def _find(self, key, position):
+        """
+        Helper method for lookup and add. Receives a position hash and the position's packed squares and color
+        to move. Returns the byte offset of the position's slot, or of the empty slot where it belongs, and
+        whether it was found.
+        """
+        data = self._map
+        slot = key & self._mask
+
+        while True:
+            offset = HEADER.size + slot * SLOT.size
+            if COUNTERS.unpack_from(data, offset + COUNTERS_OFFSET)[0] == 0:
+                return offset, False
+
+            # the squares are compared as well as the hash, so two positions can never share a slot
+            if struct.unpack_from('<Q', data, offset)[0] == key and data[offset + 8:offset + 41] == position:
+                return offset, True
+
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, game):
+        """
+        Receives a ChessVar object. Returns the PositionStats for its position (pieces and player to move),
+        or None if the position is not in the store.
+        """
+        position = game._packed_squares() + (b'\x00' if game._current_color == 'white' else b'\x01')
+        offset, found = self._find(game.position_hash(), position)
+        if not found:
+            return None
+        return PositionStats._make(COUNTERS.unpack_from(self._map, offset + COUNTERS_OFFSET))
+
+    def add(self, game, result):
+        """
+        Receives a ChessVar object and the final state of the game it comes from (UNFINISHED, WHITE_WON or
+        BLACK_WON), and counts one more game reaching its position.
+        Returns False if the result is invalid. Returns True otherwise.
+        """
+        if result not in GAME_STATES:
+            return False
+
+        if self._count + 1 > self._slots * MAX_LOAD:
+            self._grow()
+
+        color = 0 if game._current_color == 'white' else 1
+        packed = game._packed_squares()
+        key = game.position_hash()
+        offset, found = self._find(key, packed + bytes((color,)))
+
+        if found:
+            games, white_wins, black_wins = COUNTERS.unpack_from(self._map, offset + COUNTERS_OFFSET)
+        else:
+            games = white_wins = black_wins = 0
+            self._count += 1
+            HEADER.pack_into(self._map, 0, MAGIC, self._slots, self._count)
+
+        games += 1
+        if result == 'WHITE_WON':
+            white_wins += 1
+        elif result == 'BLACK_WON':
+            black_wins += 1
+
+        SLOT.pack_into(self._map, offset, key, packed, color, GAME_STATES.index(game.get_game_state()),
+                       games, white_wins, black_wins)
+        return True
+
+    def _grow(self):
+        """
+        Helper method for add: rewrites the file with twice as many slots.
+        """
+        old_map = self._map
+        old_slots = self._slots
+        temporary_path = self._path + '.tmp'
+        _create_file(temporary_path, old_slots * 2)
+
+        with open(temporary_path, 'r+b') as new_file:
+            new_map = mmap.mmap(new_file.fileno(), 0)
+            mask = old_slots * 2 - 1
+
+            for old_offset in range(HEADER.size, HEADER.size + old_slots * SLOT.size, SLOT.size):
+                if COUNTERS.unpack_from(old_map, old_offset + COUNTERS_OFFSET)[0] == 0:
+                    continue
+
+                # positions are distinct, so each one only needs an empty slot
+                slot = struct.unpack_from('<Q', old_map, old_offset)[0] & mask
+                while True:
+                    offset = HEADER.size + slot * SLOT.size
+                    if COUNTERS.unpack_from(new_map, offset + COUNTERS_OFFSET)[0] == 0:
+                        break
+                    slot = (slot + 1) & mask
+                new_map[offset:offset + SLOT.size] = old_map[old_offset:old_offset + SLOT.size]
+
+            HEADER.pack_into(new_map, 0, MAGIC, old_slots * 2, self._count)
+            new_map.close()
+
+        self.close()
+        os.replace(temporary_path, self._path)
+        self._open()
+
+    def flush(self):
+        """
+        Writes changes to the file on disk.
+        """
+        self._map.flush()
+
+    def close(self):
+        """
+        Writes changes to disk, then unmaps and closes the file.
+        """
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _create_file(path, slots):
+    """
+    Helper function: creates a position file with the given number of empty slots.
+    """
+    with open(path, 'wb') as position_file:
+        position_file.write(HEADER.pack(MAGIC, slots, 0))
+        position_file.truncate(HEADER.size + slots * SLOT.size)
+
+
+def build_position_store(store_path, record_path, max_plies=None, backend='array'):
+    """
+    Receives the path of a position file (created if needed), the path of a game record file
+    (see chess_records) and optionally how many moves into each game to look and a ChessVar backend name.
+    Replays every game and counts it once for each distinct position it reached, from the opening position on,
+    stopping at the first illegal move. Returns the number of games read.
+    """
+    game = ChessVar(backend=backend)
+    games_read = 0
+
+    with PositionStore(store_path) as store:
+        for record in read_games(record_path):
+            game.reset()
+            moves = record.moves if max_plies is None else record.moves[:max_plies]
+
+            # a position repeated within one game only counts once for it
+            seen = {game.position_hash()}
+            store.add(game, record.game_state)
+
+            for move_from, move_to in moves:
+                if not game.move_made(move_from, move_to):
+                    break
+                key = game.position_hash()
+                if key not in seen:
+                    seen.add(key)
+                    store.add(game, record.game_state)
+
+            games_read += 1
+
+    return games_read
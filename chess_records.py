@@ -0,0 +1,345 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program stores recorded "King of the Hill" games in a compact binary file
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from chess_var import ChessVar, SQUARE_NAMES, SQUARE_LOOKUP, GAME_STATES
+from chess_replay import replay_game
+
+# A record file starts with MAGIC. Each game follows as a 3-byte header (game state number from GAME_STATES,
+# then the move count as a little-endian 16-bit number) and two bytes per move: (from square << 6) | to square,
+# little-endian, with squares numbered as in SQUARE_NAMES ('a8' = 0 ... 'h1' = 63).
+# The index file (record path + '.idx') holds each game's byte offset as a little-endian 64-bit number.
+MAGIC = b'KOTH\x01'
+GAME_HEADER = struct.Struct('<BH')
+OFFSET = struct.Struct('<Q')
+MAX_MOVES = 0xFFFF
+
+GameRecord = namedtuple('GameRecord', ['game_state', 'moves'])
+GameRecord.__doc__ = """
+One game read from a record file.
+game_state is UNFINISHED, WHITE_WON or BLACK_WON. moves is a list of (move from, move to) string tuples,
+which replay_games and ChessVar.move_made accept.
+"""
+
+# every possible two-byte move word, decoded
+_DECODED_MOVES = tuple((SQUARE_NAMES[word >> 6], SQUARE_NAMES[word & 63]) for word in range(4096))
+
+
+def index_path(path):
+    """
+    Receives the path of a record file. Returns the path of its offset index.
+    """
+    return path + '.idx'
+
+
+def encode_move(move_from, move_to):
+    """
+    Receives a move as two string coordinates (e.g. 'e2', 'e4').
+    Returns the move's 12-bit number, or None if either square is invalid.
+    """
+    from_square = SQUARE_LOOKUP.get(move_from)
+    to_square = SQUARE_LOOKUP.get(move_to)
+    if from_square is None or to_square is None:
+        return None
+    return from_square << 6 | to_square
+
+
+def decode_move(word):
+    """
+    Receives a move number from encode_move. Returns the (move from, move to) string tuple.
+    """
+    return _DECODED_MOVES[word & 4095]
+
+
+def encode_game(moves, game_state='UNFINISHED'):
+    """
+    Receives a sequence of (move from, move to) pairs and the game's state.
+    Returns the game's record as bytes, or None if a square or the game state is invalid or there are
+    more than MAX_MOVES moves.
+    """
+    if game_state not in GAME_STATES or len(moves) > MAX_MOVES:
+        return None
+
+    words = array('H')
+    for move_from, move_to in moves:
+        word = encode_move(move_from, move_to)
+        if word is None:
+            return None
+        words.append(word)
+
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return GAME_HEADER.pack(GAME_STATES.index(game_state), len(words)) + words.tobytes()
+
+
+def _decode_moves(data):
+    """
+    Helper function for the readers. Receives the move bytes of one game. Returns its list of moves.
+    """
+    words = array('H', data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return [_DECODED_MOVES[word & 4095] for word in words]
+
+
+class GameWriter:
+    """
+    Represents a record file open for appending games. Writes the offset index alongside it.
+    Can be used in a with statement, which closes it.
+    """
+    def __init__(self, path):
+        """
+        Initializes a writer for the record file at path. An existing file is added to, after dropping any game
+        cut off at its end; otherwise a new one is created. Raises ValueError if an existing file is not a record file.
+        """
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as record_file:
+                if record_file.read(len(MAGIC)) != MAGIC:
+                    raise ValueError('not a game record file: %s' % path)
+            end = _indexed_end(path)
+            if end is None:
+                build_index(path)
+                end = _indexed_end(path)
+
+            # a game cut off at the end of the file is dropped, so new games follow the last complete one
+            if end < os.path.getsize(path):
+                with open(path, 'r+b') as record_file:
+                    record_file.truncate(end)
+            self._file = open(path, 'ab')
+            self._index = open(index_path(path), 'ab')
+        else:
+            # a new record file starts a new index, replacing any left from an earlier file
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC)
+            self._index = open(index_path(path), 'wb')
+
+        self._offset = self._file.tell()
+        self._count = os.path.getsize(index_path(path)) // OFFSET.size
+
+    def write_game(self, moves, game_state='UNFINISHED'):
+        """
+        Receives a sequence of (move from, move to) pairs and the game's state, and appends the game.
+        Returns the game's number in the file, or None if the game cannot be encoded (see encode_game).
+        """
+        record = encode_game(moves, game_state)
+        if record is None:
+            return None
+
+        self._file.write(record)
+        self._index.write(OFFSET.pack(self._offset))
+        self._offset += len(record)
+        self._count += 1
+        return self._count - 1
+
+    def get_game_count(self):
+        """
+        Returns the number of games in the file.
+        """
+        return self._count
+
+    def close(self):
+        """
+        Flushes and closes the record and index files.
+        """
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_games(path, games, backend='array'):
+    """
+    Receives a record file path, an iterable of games, each a sequence of (move from, move to) pairs, and an
+    optional ChessVar backend name. Replays each game to find its result and appends it to the file.
+    Games are read one at a time. Returns the number of games written; games that cannot be encoded are skipped.
+    """
+    game = ChessVar(backend=backend)
+    written = 0
+
+    with GameWriter(path) as writer:
+        for moves in games:
+            if writer.write_game(moves, replay_game(game, moves).game_state) is not None:
+                written += 1
+
+    return written
+
+
+def read_games(path):
+    """
+    Receives a record file path. Yields a GameRecord for each game in the file, in order, reading the file
+    a game at a time. Raises ValueError if the file is not a record file or ends partway through a game.
+    """
+    with open(path, 'rb') as record_file:
+        if record_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a game record file: %s' % path)
+
+        while True:
+            header = record_file.read(GAME_HEADER.size)
+            if not header:
+                return
+
+            if len(header) < GAME_HEADER.size:
+                raise ValueError('truncated game record in %s' % path)
+            state, count = GAME_HEADER.unpack(header)
+
+            data = record_file.read(2 * count)
+            if len(data) < 2 * count or state >= len(GAME_STATES):
+                raise ValueError('truncated game record in %s' % path)
+            yield GameRecord(GAME_STATES[state], _decode_moves(data))
+
+
+def build_index(path):
+    """
+    Receives a record file path. Writes its offset index, replacing any existing one, and returns the number
+    of games. A game cut off at the end of the file is left out. Raises ValueError if the file is not a record file.
+    """
+    size = os.path.getsize(path)
+    offset = len(MAGIC)
+    offsets = []
+
+    with open(path, 'rb') as record_file:
+        if record_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a game record file: %s' % path)
+
+        while True:
+            header = record_file.read(GAME_HEADER.size)
+            if len(header) < GAME_HEADER.size:
+                break
+            length = GAME_HEADER.size + 2 * GAME_HEADER.unpack(header)[1]
+            if offset + length > size:
+                break
+            offsets.append(OFFSET.pack(offset))
+            offset += length
+            record_file.seek(offset)
+
+    with open(index_path(path), 'wb') as index_file:
+        index_file.write(b''.join(offsets))
+    return len(offsets)
+
+
+def index_matches(path):
+    """
+    Receives the path of a record file. Returns True if its index file exists and ends at the file's last
+    complete game: the last offset holds a game that fits in the file and no complete game follows it.
+    Returns False otherwise, e.g. for an index left from an earlier file at the same path.
+    """
+    return _indexed_end(path) is not None
+
+
+def _indexed_end(path):
+    """
+    Helper function for index_matches and GameWriter. Receives the path of a record file.
+    Returns the byte offset where the last indexed game ends if the index matches the file (see index_matches).
+    Returns None otherwise.
+    """
+    if not os.path.exists(index_path(path)):
+        return None
+
+    size = os.path.getsize(path)
+    index_size = os.path.getsize(index_path(path))
+    if index_size % OFFSET.size:
+        return None
+
+    with open(path, 'rb') as record_file:
+        end = len(MAGIC)
+        if index_size:
+            with open(index_path(path), 'rb') as index_file:
+                index_file.seek(index_size - OFFSET.size)
+                offset = OFFSET.unpack(index_file.read(OFFSET.size))[0]
+
+            record_file.seek(offset)
+            header = record_file.read(GAME_HEADER.size)
+            if offset < len(MAGIC) or len(header) < GAME_HEADER.size:
+                return None
+            end = offset + GAME_HEADER.size + 2 * GAME_HEADER.unpack(header)[1]
+            if end > size:
+                return None
+
+        # a game after the last indexed one is only allowed if it is cut off
+        record_file.seek(end)
+        header = record_file.read(GAME_HEADER.size)
+        if len(header) < GAME_HEADER.size or end + GAME_HEADER.size + 2 * GAME_HEADER.unpack(header)[1] > size:
+            return end
+        return None
+
+
+class GameArchive:
+    """
+    Represents a record file opened for random access: the file and its offset index are memory-mapped,
+    so the N-th game is read without reading the games before it.
+    Can be used in a with statement, which closes it.
+    """
+    def __init__(self, path):
+        """
+        Initializes an archive for the record file at path, building the index first if it is missing
+        or was not written for this file (see index_matches). Raises ValueError if the file is not a record file.
+        """
+        if not index_matches(path):
+            build_index(path)
+
+        self._offsets = None
+        self._file = open(path, 'rb')
+        self._index_file = open(index_path(path), 'rb')
+        self._records = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._records[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('not a game record file: %s' % path)
+
+        # an empty file cannot be mapped; an archive without games has an empty index
+        self._count = os.path.getsize(index_path(path)) // OFFSET.size
+        if self._count:
+            self._offsets = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_game_count(self):
+        """
+        Returns the number of games in the archive.
+        """
+        return self._count
+
+    def get_game(self, number):
+        """
+        Receives a game number (0 for the first game). Returns its GameRecord, or None if there is no such game.
+        """
+        if not 0 <= number < self._count:
+            return None
+
+        offset = OFFSET.unpack_from(self._offsets, number * OFFSET.size)[0]
+        state, count = GAME_HEADER.unpack_from(self._records, offset)
+        start = offset + GAME_HEADER.size
+        return GameRecord(GAME_STATES[state], _decode_moves(self._records[start:start + 2 * count]))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, number):
+        record = self.get_game(number)
+        if record is None:
+            raise IndexError('game number out of range')
+        return record
+
+    def close(self):
+        """
+        Unmaps and closes the record and index files.
+        """
+        if self._offsets is not None:
+            self._offsets.close()
+        self._records.close()
+        self._index_file.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
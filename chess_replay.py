@@ -0,0 +1,230 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program replays recorded "King of the Hill" games in bulk to check them
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from chess_var import ChessVar
+
+ReplayResult = namedtuple('ReplayResult', ['game_state', 'winner', 'illegal_move_index', 'moves_played'])
+ReplayResult.__doc__ = """
+Result of replaying one game.
+game_state is the ChessVar game state after the last legal move (UNFINISHED, WHITE_WON or BLACK_WON).
+winner is 'white', 'black' or None. illegal_move_index is the index of the first move move_made rejected,
+or None if every move was legal. moves_played counts the legal moves made.
+"""
+
+# winner for each game state
+WINNERS = {'UNFINISHED': None, 'WHITE_WON': 'white', 'BLACK_WON': 'black'}
+
+
+def replay_game(game, moves):
+    """
+    Receives a ChessVar object and a sequence of (move from, move to) pairs.
+    Resets the game, plays the moves until the first illegal one and returns a ReplayResult.
+    """
+    game.reset()
+    move_made = game.move_made
+    illegal_move_index = None
+    moves_played = 0
+
+    for move_from, move_to in moves:
+        if not move_made(move_from, move_to):
+            illegal_move_index = moves_played
+            break
+        moves_played += 1
+
+    state = game.get_game_state()
+    return ReplayResult(state, WINNERS[state], illegal_move_index, moves_played)
+
+
+def replay_games(games, backend='array'):
+    """
+    Receives an iterable of games, each a sequence of (move from, move to) pairs such as [['e2', 'e4'], ...],
+    and an optional ChessVar backend name.
+    Yields one ReplayResult per game, in order. A single ChessVar is reset and reused for every game,
+    so games are read and replayed one at a time.
+    """
+    game = ChessVar(backend=backend)
+
+    for moves in games:
+        yield replay_game(game, moves)
+
+
+def validate_game(game, moves, stop_on_error=True):
+    """
+    Receives a ChessVar object, a sequence of (move from, move to) pairs and whether to stop at the first
+    rejected move. Resets the game and checks each move in turn, making the legal ones.
+    Returns a list with one reason per move checked, from chess_var.MOVE_REASONS ('OK' for a legal move).
+    With stop_on_error=True the list ends at the first rejected move; otherwise rejected moves are skipped
+    and the following moves are checked against the position before them.
+    """
+    game.reset()
+    check_move = game._check_move
+    make = game._make
+    verdicts = []
+
+    for move_from, move_to in moves:
+        reason, from_square, to_square = check_move(move_from, move_to)
+        verdicts.append(reason)
+
+        if reason == 'OK':
+            make(from_square, to_square)
+        elif stop_on_error:
+            break
+
+    return verdicts
+
+
+def validate_games(games, stop_on_error=True, backend='array'):
+    """
+    Receives an iterable of games, each a sequence of (move from, move to) pairs, whether to stop each game at its
+    first rejected move and an optional ChessVar backend name.
+    Yields the list of reasons from validate_game for each game, in order, reading the games one at a time.
+    """
+    game = ChessVar(backend=backend)
+
+    for moves in games:
+        yield validate_game(game, moves, stop_on_error)
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Process pool. Each worker process keeps one ChessVar for its whole life; work is sent in chunks
+# so the cost of pickling is paid per chunk rather than per game.
+# ---------------------------------------------------------------------------------------------------------
+
+_worker_game = None
+
+
+def _init_worker(backend):
+    """
+    Runs once in each worker process: creates the worker's ChessVar.
+    """
+    global _worker_game
+    _worker_game = ChessVar(backend=backend)
+
+
+def _replay_chunk(games):
+    """
+    Runs in a worker process. Receives a list of games and returns a list of ReplayResults.
+    """
+    return [replay_game(_worker_game, moves) for moves in games]
+
+
+def _perft_chunk(jobs):
+    """
+    Runs in a worker process. Receives a list of (moves, depth) jobs; for each, plays the moves from the
+    opening position and counts perft to the depth. Returns a list of counts (None if a move was illegal).
+    """
+    counts = []
+    for moves, depth in jobs:
+        if replay_game(_worker_game, moves).illegal_move_index is not None:
+            counts.append(None)
+        else:
+            counts.append(_worker_game.perft(depth))
+    return counts
+
+
+def _chunks(items, chunk_size):
+    """
+    Receives an iterable and a chunk size. Yields lists of up to chunk_size consecutive items.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def pool_map(function, items, processes=None, chunk_size=64, ordered=True, backend='array', max_restarts=2):
+    """
+    Receives a module-level function that maps a list of items to a list of results, an iterable of items,
+    and pool settings. Runs the function over chunks of the items in worker processes and yields the results.
+    processes defaults to the number of CPUs. With ordered=True results come back in input order; otherwise
+    each chunk's results are yielded as soon as it finishes. At most two chunks per process are in flight,
+    so the input is read as it is needed.
+    If a worker process dies, the pool is restarted and unfinished chunks are resubmitted, up to max_restarts
+    times; after that BrokenProcessPool is raised.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    chunks = _chunks(items, chunk_size)
+    max_pending = 2 * processes
+    restarts = 0
+    pending = {}            # chunk number -> (chunk, future), in submission order
+    next_number = 0
+    exhausted = False
+    executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(backend,))
+
+    try:
+        while True:
+            # keep the workers supplied
+            while not exhausted and len(pending) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending[next_number] = (chunk, executor.submit(function, chunk))
+                    next_number += 1
+
+            if not pending:
+                return
+
+            if ordered:
+                finished = [next(iter(pending))]
+                wait([pending[finished[0]][1]])
+            else:
+                done, not_done = wait([future for chunk, future in pending.values()], return_when=FIRST_COMPLETED)
+                finished = [number for number, (chunk, future) in pending.items() if future in done]
+
+            try:
+                for number in finished:
+                    results = pending[number][1].result()
+                    del pending[number]
+                    yield from results
+
+            except BrokenProcessPool:
+                restarts += 1
+                if restarts > max_restarts:
+                    raise
+
+                # replace the pool and resubmit everything that has not been yielded
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(backend,))
+                for number, (chunk, future) in list(pending.items()):
+                    pending[number] = (chunk, executor.submit(function, chunk))
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def replay_games_parallel(games, processes=None, chunk_size=64, ordered=True, backend='array', max_restarts=2):
+    """
+    Same as replay_games, but shares the games out among worker processes (see pool_map for the settings).
+    Yields one ReplayResult per game; in input order unless ordered=False.
+    """
+    return pool_map(_replay_chunk, games, processes, chunk_size, ordered, backend, max_restarts)
+
+
+def perft_parallel(depth, moves=(), processes=None, backend='array'):
+    """
+    Receives a depth and optionally a sequence of (move from, move to) pairs leading to the position to count
+    from (default: the opening position). Returns ChessVar.perft(depth) for that position, computed by giving
+    each first move's subtree to a worker process. Returns None if one of the moves is illegal.
+    """
+    game = ChessVar(backend=backend)
+    if replay_game(game, moves).illegal_move_index is not None:
+        return None
+
+    if depth <= 1:
+        return game.perft(depth)
+
+    jobs = [(list(moves) + [root_move], depth - 1) for root_move in game.legal_moves()]
+    return sum(pool_map(_perft_chunk, jobs, processes, chunk_size=1, backend=backend))
@@ -0,0 +1,402 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program searches "King of the Hill" positions for the best move (computer opponent)
+
+import time
+from array import array
+from collections import namedtuple
+
+from chess_var import SQUARE_NAMES, EMPTY, KING, CENTRAL_SQUARES
+
+# material value of each piece type, indexed by piece type (code & 7)
+PIECE_VALUES = (0, 100, 500, 300, 300, 900, 0, 0)
+
+# score for a won game; wins found sooner score higher
+WIN_SCORE = 100000
+
+# number of king moves from each square to the nearest central square (d4, d5, e4, e5)
+HILL_DISTANCE = tuple(
+    min(max(abs((square >> 3) - (center >> 3)), abs((square & 7) - (center & 7))) for center in CENTRAL_SQUARES)
+    for square in range(64)
+)
+
+# bonus for a king, indexed by its distance from the hill
+KING_HILL_BONUS = (0, 120, 60, 25, 10, 0, 0, 0)
+
+SearchResult = namedtuple('SearchResult', ['best_move', 'score', 'depth', 'nodes', 'principal_variation'])
+SearchResult.__doc__ = """
+Result of Searcher.search.
+best_move and each entry of principal_variation are (move from, move to) string tuples, as from legal_moves.
+score is from the point of view of the player to move. depth is the last fully searched depth.
+"""
+
+
+# transposition table bound types (0 marks an empty slot)
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# scores this close to WIN_SCORE are wins, stored relative to the node rather than the root
+_WIN_THRESHOLD = WIN_SCORE - 1000
+
+# an entry's data word: move in bits 0-11 with a presence flag in bit 12, bound in bits 13-14,
+# depth in bits 16-23 and score (offset to be non-negative) in bits 24-47
+_HAS_MOVE = 1 << 12
+_SCORE_OFFSET = 1 << 20
+
+
+class TranspositionTable:
+    """
+    Represents a fixed-size cache of search results keyed by position hash.
+    Entries live in two preallocated arrays (hash keys and packed data words), 16 bytes per entry.
+    Each bucket has two slots: the first keeps the deepest result, the second is always replaced.
+    """
+    def __init__(self, size_mb=16):
+        """
+        Initializes an empty table using at most size_mb megabytes (at least one bucket).
+        """
+        buckets = 1
+        while buckets * 2 * 32 <= size_mb * 1024 * 1024:
+            buckets *= 2
+
+        self._mask = buckets - 1
+        self._keys = array('Q', bytes(16 * buckets))
+        self._data = array('Q', bytes(16 * buckets))
+        self._hits = 0
+        self._misses = 0
+        self._collisions = 0
+
+    def get_size(self):
+        """
+        Returns the number of entries the table can hold.
+        """
+        return len(self._keys)
+
+    def get_stats(self):
+        """
+        Returns a dictionary with the number of probe hits, misses and collisions
+        (misses where the bucket was full of other positions).
+        """
+        return {'hits': self._hits, 'misses': self._misses, 'collisions': self._collisions}
+
+    def clear(self):
+        """
+        Empties the table and resets the counters.
+        """
+        self._data = array('Q', bytes(8 * len(self._data)))
+        self._hits = 0
+        self._misses = 0
+        self._collisions = 0
+
+    def probe(self, key):
+        """
+        Receives a position hash.
+        Returns a (depth, score, bound, move) tuple for that position, where move is a (from square, to square)
+        tuple or None. Returns None if the position is not in the table.
+        """
+        slot = (key & self._mask) << 1
+        data = self._data
+
+        for index in (slot, slot + 1):
+            if data[index] != 0 and self._keys[index] == key:
+                self._hits += 1
+                word = data[index]
+                move = ((word >> 6) & 63, word & 63) if word & _HAS_MOVE else None
+                return (word >> 16) & 255, ((word >> 24) & 0xFFFFFF) - _SCORE_OFFSET, (word >> 13) & 3, move
+
+        self._misses += 1
+        if data[slot] != 0 and data[slot + 1] != 0:
+            self._collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """
+        Receives a position hash, search depth, score, bound type (EXACT, LOWER_BOUND or UPPER_BOUND) and
+        best move (a (from square, to square) tuple or None) and stores them.
+        """
+        word = ((score + _SCORE_OFFSET) << 24) | (min(depth, 255) << 16) | (bound << 13)
+        if move is not None:
+            word |= _HAS_MOVE | (move[0] << 6) | move[1]
+
+        slot = (key & self._mask) << 1
+
+        # depth-preferred slot: same position, or a result at least as deep
+        if self._data[slot] == 0 or self._keys[slot] == key or depth >= (self._data[slot] >> 16) & 255:
+            index = slot
+
+        # always-replace slot
+        else:
+            index = slot + 1
+
+        self._keys[index] = key
+        self._data[index] = word
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time or node budget runs out.
+    """
+
+
+def evaluate(game):
+    """
+    Receives a ChessVar object.
+    Returns a score for the player to move: material balance plus a bonus for a king close to the hill.
+    """
+    squares = game._squares
+    score = 0
+
+    for square in game._piece_squares[0]:
+        score += PIECE_VALUES[squares[square] & 7]
+    for square in game._piece_squares[1]:
+        score -= PIECE_VALUES[squares[square] & 7]
+
+    # kings have no material value, only their distance from the hill
+    white_king, black_king = game._king_squares
+    if white_king is not None:
+        score += KING_HILL_BONUS[HILL_DISTANCE[white_king]]
+    if black_king is not None:
+        score -= KING_HILL_BONUS[HILL_DISTANCE[black_king]]
+
+    if game._current_color == 'black':
+        return -score
+    return score
+
+
+class Searcher:
+    """
+    Represents a computer player for ChessVar.
+    Uses negamax with alpha-beta pruning, iterative deepening and a transposition table. The only terminal
+    positions are the variant's wins (king captured or king on d4, d5, e4 or e5), recognised through the game state.
+    """
+    def __init__(self, max_depth=4, time_limit=None, node_limit=None, table_mb=16, table=None, book=None):
+        """
+        Initializes a Searcher with a maximum depth and optional budgets:
+        time_limit in seconds and node_limit in positions visited. When a budget runs out, the result of the
+        last completed depth is returned.
+        A TranspositionTable of table_mb megabytes is created unless one is passed as table.
+        book is an optional chess_book.OpeningBook consulted before searching.
+        """
+        self._book = book
+        self._table = table if table is not None else TranspositionTable(table_mb)
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._nodes = 0
+        self._deadline = None
+
+    def search(self, game):
+        """
+        Receives a ChessVar object and searches it for the player to move.
+        Returns a SearchResult; best_move is None if there are no legal moves.
+        If the opening book has a move for the position, it is returned without searching, with depth 0.
+        The game is left exactly as it was passed in.
+        """
+        self._nodes = 0
+        self._deadline = None if self._time_limit is None else time.perf_counter() + self._time_limit
+
+        if self._book is not None and game._game_state == 'UNFINISHED':
+            book_move = self._book.choose_move(game)
+            if book_move is not None:
+                return SearchResult(book_move, 0, 0, 0, [book_move])
+
+        root_moves = self._order_moves(game, game._generate_moves(), None)
+        result = SearchResult(None, 0, 0, 0, [])
+        if not root_moves:
+            return result
+
+        undo_depth = len(game._undo_stack)
+        best_move = root_moves[0]
+
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score, principal_variation = self._search_root(game, depth, root_moves, best_move)
+            except SearchTimeout:
+                # take back any moves the interrupted search left on the board
+                while len(game._undo_stack) > undo_depth:
+                    game._unmake()
+                break
+
+            best_move = principal_variation[0]
+            result = SearchResult(
+                (SQUARE_NAMES[best_move[0]], SQUARE_NAMES[best_move[1]]),
+                score, depth, self._nodes,
+                [(SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]) for move in principal_variation],
+            )
+
+            # a forced win or loss cannot change with more depth
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                break
+
+        if result.best_move is None:
+            # not even depth 1 finished: fall back to the first ordered move
+            result = SearchResult((SQUARE_NAMES[best_move[0]], SQUARE_NAMES[best_move[1]]), 0, 0, self._nodes,
+                                  [(SQUARE_NAMES[best_move[0]], SQUARE_NAMES[best_move[1]])])
+        return result
+
+    def get_table(self):
+        """
+        Returns the Searcher's TranspositionTable.
+        """
+        return self._table
+
+    def get_book(self):
+        """
+        Returns the Searcher's opening book, or None if it has none.
+        """
+        return self._book
+
+    def set_book(self, book):
+        """
+        Receives an opening book (or None for no book) for the Searcher to consult.
+        """
+        self._book = book
+
+    def get_nodes(self):
+        """
+        Returns the number of positions visited by the most recent search.
+        """
+        return self._nodes
+
+    def _search_root(self, game, depth, moves, first_move):
+        """
+        Helper method for search. Searches the root moves to the given depth, trying first_move first.
+        Returns the score and principal variation (list of square number tuples).
+        """
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_line = None
+
+        ordered = [first_move] + [move for move in moves if move != first_move]
+        for move in ordered:
+            game._make(move[0], move[1])
+            score, line = self._negamax(game, depth - 1, -beta, -alpha, 1)
+            game._unmake()
+            score = -score
+
+            if best_line is None or score > alpha:
+                alpha = score
+                best_line = [move] + line
+
+        return alpha, best_line
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """
+        Helper method for search. Returns the score of the position for the player to move and the
+        principal variation below it.
+        """
+        self._count_node()
+
+        # the previous move won the game
+        if game._game_state != 'UNFINISHED':
+            return ply - WIN_SCORE, []
+
+        if depth == 0:
+            return evaluate(game), []
+
+        # a stored result for this position may settle it or at least suggest a first move
+        key = game._hash
+        entry = self._table.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, score, bound, table_move = entry
+            if entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                line = [] if table_move is None else [table_move]
+                if bound == EXACT:
+                    return score, line
+                if bound == LOWER_BOUND and score >= beta:
+                    return score, line
+                if bound == UPPER_BOUND and score <= alpha:
+                    return score, line
+
+        moves = game._generate_moves()
+        if not moves:
+            return 0, []
+
+        original_alpha = alpha
+        best_line = []
+        for move in self._order_moves(game, moves, table_move):
+            game._make(move[0], move[1])
+            score, line = self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game._unmake()
+            score = -score
+
+            if score >= beta:
+                self._table.store(key, depth, _score_to_table(score, ply), LOWER_BOUND, move)
+                return score, [move] + line
+
+            if score > alpha:
+                alpha = score
+                best_line = [move] + line
+
+        if alpha > original_alpha:
+            self._table.store(key, depth, _score_to_table(alpha, ply), EXACT, best_line[0])
+        else:
+            self._table.store(key, depth, _score_to_table(alpha, ply), UPPER_BOUND, None)
+
+        return alpha, best_line
+
+    def _count_node(self):
+        """
+        Helper method for the search. Counts a node and raises SearchTimeout when a budget is exhausted.
+        """
+        self._nodes += 1
+
+        if self._node_limit is not None and self._nodes > self._node_limit:
+            raise SearchTimeout()
+
+        # checking the clock is comparatively slow, so only every 1024 nodes
+        if self._deadline is not None and self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+    def _order_moves(self, game, moves, best_move):
+        """
+        Helper method for the search. Receives a list of moves and an optional move to try first.
+        Returns the moves ordered: best_move, king captures and king moves onto the hill, other captures
+        (most valuable victim first), king moves toward the hill, then the rest.
+        """
+        squares = game._squares
+
+        def priority(move):
+            if move == best_move:
+                return -1000000
+
+            moving_code = squares[move[0]]
+            captured_code = squares[move[1]]
+
+            # winning moves first
+            if captured_code & 7 == KING:
+                return -100000
+            if moving_code & 7 == KING and HILL_DISTANCE[move[1]] == 0:
+                return -100000
+
+            if captured_code != EMPTY:
+                return -10 * PIECE_VALUES[captured_code & 7] + PIECE_VALUES[moving_code & 7] // 100
+            if moving_code & 7 == KING and HILL_DISTANCE[move[1]] < HILL_DISTANCE[move[0]]:
+                return 0
+            return 1
+
+        return sorted(moves, key=priority)
+
+
+def _score_to_table(score, ply):
+    """
+    Receives a score and the ply it was found at. Returns the score to store: wins are made relative to the node.
+    """
+    if score > _WIN_THRESHOLD:
+        return score + ply
+    if score < -_WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    """
+    Receives a stored score and the current ply. Reverses _score_to_table.
+    """
+    if score > _WIN_THRESHOLD:
+        return score - ply
+    if score < -_WIN_THRESHOLD:
+        return score + ply
+    return score
@@ -0,0 +1,428 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program serves many "King of the Hill" games at once over a local socket with asyncio
+
+import asyncio
+import contextlib
+import json
+import secrets
+import sys
+import time
+
+from chess_var import ChessVar
+
+# Protocol: one JSON object per line in each direction. A request names an operation and, except for new_game,
+# the game it applies to; an optional "id" is echoed back in the response:
+#   {"op": "new_game"}                                          -> {"ok": true, "game": "<game id>"}
+#   {"op": "move_made", "game": ..., "from": "e2", "to": "e4"}  -> {"ok": true, "result": true, "reason": "OK",
+#                                                                   "game_state": "UNFINISHED"}
+#   {"op": "get_board", "game": ...}                            -> {"ok": true, "result": [[...], ...]}
+#   {"op": "get_game_state", "game": ...}                       -> {"ok": true, "result": "UNFINISHED"}
+#   {"op": "close_game", "game": ...}                           -> {"ok": true, "result": true}
+# A request that cannot be carried out gets {"ok": false, "error": <one of ERRORS>}.
+OPERATIONS = ('new_game', 'move_made', 'get_board', 'get_game_state', 'close_game')
+ERRORS = ('BAD_REQUEST', 'UNKNOWN_OP', 'UNKNOWN_GAME', 'TOO_MANY_GAMES', 'LINE_TOO_LONG', 'SERVER_BUSY')
+
+# a new game starts parked in the opening position, so games that are never played cost almost nothing
+START_POSITION = ChessVar().snapshot()
+
+# a saved registry file: MAGIC, then for each game its 8-byte id and its 34-byte snapshot
+MAGIC = b'KOTHSESS'
+GAME_ID_BYTES = 8
+
+# games parked or removed per step of the sweep before other requests get a turn
+SWEEP_BATCH = 256
+
+
+class Session:
+    """
+    Represents one game held by a SessionRegistry: either a live ChessVar or, while parked, its 34-byte
+    snapshot (see ChessVar.snapshot). The lock exists only while requests for the game are in progress.
+    """
+    __slots__ = ('game', 'parked', 'last_used', 'lock', 'users')
+
+    def __init__(self, parked, now):
+        """
+        Initializes a session for a parked game last used at the given time.
+        """
+        self.game = None
+        self.parked = parked
+        self.last_used = now
+        self.lock = None
+        self.users = 0
+
+
+class SessionRegistry:
+    """
+    Represents the games being served, keyed by game id and kept in order of last use; the live (not parked)
+    games are also kept in a second dictionary of their own, in the same order, so sweeps never walk parked games.
+    Games idle for park_after seconds are parked: only the game's snapshot is kept, and the game is restored
+    when next used (the moves remembered for unmake_move are dropped). Games idle for idle_timeout seconds are
+    removed. Either limit may be None to turn it off.
+    """
+    def __init__(self, max_games=None, park_after=60.0, idle_timeout=3600.0, backend='array'):
+        """
+        Initializes an empty registry holding at most max_games games (no limit if None), whose games use
+        the given ChessVar backend.
+        """
+        self._sessions = {}
+        self._live = {}
+        self._max_games = max_games
+        self._park_after = park_after
+        self._idle_timeout = idle_timeout
+        self._backend = backend
+
+    def get_count(self):
+        """
+        Returns the number of games in the registry, live or parked.
+        """
+        return len(self._sessions)
+
+    def get_live_count(self):
+        """
+        Returns the number of games that are not parked.
+        """
+        return len(self._live)
+
+    def new_game(self):
+        """
+        Creates a game in the opening position. Returns its id, or None if the registry is full.
+        """
+        if self._max_games is not None and len(self._sessions) >= self._max_games:
+            return None
+
+        game_id = secrets.token_hex(GAME_ID_BYTES)
+        while game_id in self._sessions:
+            game_id = secrets.token_hex(GAME_ID_BYTES)
+
+        self._sessions[game_id] = Session(START_POSITION, time.monotonic())
+        return game_id
+
+    def get_game(self, game_id):
+        """
+        Receives a game id. Returns the game's ChessVar, rebuilding it if it was parked, and marks the game as used.
+        Returns None if there is no such game.
+        """
+        session = self._sessions.pop(game_id, None)
+        if session is None:
+            return None
+
+        # most recently used last
+        self._sessions[game_id] = session
+        self._live.pop(game_id, None)
+        session.last_used = time.monotonic()
+        if session.game is None:
+            session.game = ChessVar.restore(session.parked, self._backend)
+            session.parked = None
+
+            if session.game is None:
+                del self._sessions[game_id]
+                return None
+
+        self._live[game_id] = session
+        return session.game
+
+    def close_game(self, game_id):
+        """
+        Receives a game id and removes the game. Returns True if it existed. Returns False otherwise.
+        """
+        self._live.pop(game_id, None)
+        return self._sessions.pop(game_id, None) is not None
+
+    def park_idle(self, now=None, limit=None):
+        """
+        Parks games idle for longer than park_after and removes games idle for longer than idle_timeout,
+        skipping games with requests in progress. Receives an optional time.monotonic() reading to use as now
+        and an optional limit on the number of games parked or removed in one call.
+        Returns a (parked, removed) tuple of counts.
+        """
+        if now is None:
+            now = time.monotonic()
+        removed = []
+        parked = []
+
+        # the games are in order of last use, so each walk stops at the first game not idle for long enough
+        if self._idle_timeout is not None:
+            for game_id, session in self._sessions.items():
+                if now - session.last_used <= self._idle_timeout or (limit is not None and len(removed) >= limit):
+                    break
+                if not session.users:
+                    removed.append(game_id)
+
+            for game_id in removed:
+                del self._sessions[game_id]
+                self._live.pop(game_id, None)
+
+        # only live games are walked to park, so parked games are never looked at again
+        if self._park_after is not None:
+            for game_id, session in self._live.items():
+                if (now - session.last_used <= self._park_after
+                        or (limit is not None and len(removed) + len(parked) >= limit)):
+                    break
+                if not session.users:
+                    parked.append(game_id)
+
+            for game_id in parked:
+                session = self._live.pop(game_id)
+                session.parked = session.game.snapshot()
+                session.game = None
+
+        return len(parked), len(removed)
+
+    def save(self, path):
+        """
+        Receives a file path and writes every game's id and snapshot to it, replacing the file.
+        Returns the number of games saved.
+        """
+        with open(path, 'wb') as session_file:
+            session_file.write(MAGIC)
+            for game_id, session in self._sessions.items():
+                snapshot = session.parked if session.game is None else session.game.snapshot()
+                session_file.write(bytes.fromhex(game_id) + snapshot)
+        return len(self._sessions)
+
+    def load(self, path):
+        """
+        Receives the path of a file written by save and adds its games, parked, to the registry.
+        Returns the number of games loaded. Raises ValueError if the file is not a saved registry.
+        Each snapshot is checked when its game is next used; a game whose snapshot is damaged is dropped then.
+        """
+        with open(path, 'rb') as session_file:
+            data = session_file.read()
+
+        record_size = GAME_ID_BYTES + 34
+        if data[:len(MAGIC)] != MAGIC or (len(data) - len(MAGIC)) % record_size:
+            raise ValueError('not a saved session file: %s' % path)
+
+        now = time.monotonic()
+        for offset in range(len(MAGIC), len(data), record_size):
+            snapshot = data[offset + GAME_ID_BYTES:offset + record_size]
+            game_id = data[offset:offset + GAME_ID_BYTES].hex()
+            self._sessions[game_id] = Session(snapshot, now)
+            self._live.pop(game_id, None)
+
+        return (len(data) - len(MAGIC)) // record_size
+
+    @contextlib.asynccontextmanager
+    async def locked(self, game_id):
+        """
+        Receives a game id. Waits for the game's lock and yields its ChessVar (None if there is no such game),
+        so requests for one game run one at a time while other games are served in between.
+        """
+        session = self._sessions.get(game_id)
+        if session is None:
+            yield None
+            return
+
+        if session.lock is None:
+            session.lock = asyncio.Lock()
+        session.users += 1
+        try:
+            async with session.lock:
+                # the game may have been closed while waiting
+                yield self.get_game(game_id) if self._sessions.get(game_id) is session else None
+        finally:
+            session.users -= 1
+            if session.users == 0:
+                session.lock = None
+
+
+class GameServer:
+    """
+    Represents a server for a SessionRegistry, speaking the line-delimited JSON protocol above over TCP or a Unix
+    socket. Each connection's requests are answered in order and the next request is not read until the response
+    has been handed to the socket (backpressure for clients that do not read). At most max_connections clients
+    are served at once and request lines may be at most max_line bytes.
+    """
+    def __init__(self, registry=None, max_connections=1000, max_line=4096, sweep_interval=5.0):
+        """
+        Initializes a server for the registry (a new SessionRegistry if None). Idle games are parked and removed
+        every sweep_interval seconds while the server runs.
+        """
+        self._registry = registry if registry is not None else SessionRegistry()
+        self._max_connections = max_connections
+        self._max_line = max_line
+        self._sweep_interval = sweep_interval
+        self._connections = 0
+        self._server = None
+        self._sweeper = None
+
+    def get_registry(self):
+        """
+        Returns the server's SessionRegistry.
+        """
+        return self._registry
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        Starts listening on a Unix socket at path if given, otherwise on TCP host and port (0 picks a free port).
+        Returns the asyncio Server.
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=path, limit=self._max_line)
+        else:
+            self._server = await asyncio.start_server(self._serve_client, host, port, limit=self._max_line)
+
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+        return self._server
+
+    def get_address(self):
+        """
+        Returns the address the server listens on: a (host, port) tuple for TCP, a path for a Unix socket.
+        """
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        """
+        Stops listening and stops sweeping idle games.
+        """
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _sweep(self):
+        """
+        Parks and removes idle games every sweep_interval seconds.
+        """
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+
+            # a batch at a time, letting requests in between
+            while sum(self._registry.park_idle(limit=SWEEP_BATCH)) == SWEEP_BATCH:
+                await asyncio.sleep(0)
+
+    async def _serve_client(self, reader, writer):
+        """
+        Answers one client's requests until it disconnects.
+        """
+        if self._connections >= self._max_connections:
+            writer.write(_encode({'ok': False, 'error': 'SERVER_BUSY'}))
+            await _close_writer(writer)
+            return
+
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line did not fit in the limit; the rest of the stream cannot be trusted
+                    writer.write(_encode({'ok': False, 'error': 'LINE_TOO_LONG'}))
+                    break
+
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                writer.write(_encode(await self.handle_line(line)))
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            await _close_writer(writer)
+
+    async def handle_line(self, line):
+        """
+        Receives one request line (bytes or str). Returns the response as a dictionary.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'BAD_REQUEST'}
+
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'BAD_REQUEST'}
+
+        response = await self.handle(request)
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def handle(self, request):
+        """
+        Receives a request dictionary. Carries it out and returns the response dictionary.
+        """
+        operation = request.get('op')
+        if operation not in OPERATIONS:
+            return {'ok': False, 'error': 'UNKNOWN_OP'}
+
+        if operation == 'new_game':
+            game_id = self._registry.new_game()
+            if game_id is None:
+                return {'ok': False, 'error': 'TOO_MANY_GAMES'}
+            return {'ok': True, 'game': game_id}
+
+        game_id = request.get('game')
+        if not isinstance(game_id, str):
+            return {'ok': False, 'error': 'BAD_REQUEST'}
+
+        if operation == 'close_game':
+            async with self._registry.locked(game_id) as game:
+                if game is None:
+                    return {'ok': False, 'error': 'UNKNOWN_GAME'}
+                return {'ok': True, 'result': self._registry.close_game(game_id)}
+
+        async with self._registry.locked(game_id) as game:
+            if game is None:
+                return {'ok': False, 'error': 'UNKNOWN_GAME'}
+
+            if operation == 'get_board':
+                return {'ok': True, 'result': game.get_board()}
+
+            if operation == 'get_game_state':
+                return {'ok': True, 'result': game.get_game_state()}
+
+            # move_made, also reporting the reason (see ChessVar.attempt_move)
+            move_from = request.get('from')
+            move_to = request.get('to')
+            if not isinstance(move_from, str) or not isinstance(move_to, str):
+                return {'ok': False, 'error': 'BAD_REQUEST'}
+
+            reason = game.attempt_move(move_from, move_to)
+            return {'ok': True, 'result': reason == 'OK', 'reason': reason, 'game_state': game.get_game_state()}
+
+
+def _encode(response):
+    """
+    Helper function: returns a response dictionary as one line of JSON bytes.
+    """
+    return json.dumps(response, separators=(',', ':')).encode() + b'\n'
+
+
+async def _close_writer(writer):
+    """
+    Helper function: closes a client's stream, ignoring a connection that is already gone.
+    """
+    writer.close()
+    with contextlib.suppress(ConnectionError):
+        await writer.wait_closed()
+
+
+async def serve(address):
+    """
+    Receives a TCP port number or a Unix socket path and serves games there until interrupted.
+    """
+    server = GameServer()
+    if isinstance(address, int):
+        await server.start(port=address)
+    else:
+        await server.start(path=address)
+    print('serving on', server.get_address())
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    argument = sys.argv[1] if len(sys.argv) > 1 else '8765'
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(int(argument) if argument.isdigit() else argument))
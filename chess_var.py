@@ -3,16 +3,169 @@
 # Date: 03/16/2025 (uploaded to GitHub: 07/10/2025)
 # Description: This program simulates a game of the chess variant "King of the Hill"
 
+import random
+from types import MappingProxyType
+
+# squares are numbered 0-63 in the same order as the nested list 'board':
+# index = row * 8 + column, so 'a8' is 0, 'h8' is 7, 'a1' is 56 and 'h1' is 63
+SQUARE_NAMES = tuple(letter + number for number in '87654321' for letter in 'abcdefgh')
+SQUARE_NUMBERS = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+# square number for every spelling of a coordinate, lowercase or uppercase letter (e.g. 'e4' and 'E4')
+SQUARE_LOOKUP = dict(SQUARE_NUMBERS)
+SQUARE_LOOKUP.update({name.upper(): index for name, index in SQUARE_NUMBERS.items()})
+
+# string coordinate <-> (row, column) index tuple on the nested list 'board', in both letter cases
+COORDINATE_INDEXES = {name: (index >> 3, index & 7) for name, index in SQUARE_LOOKUP.items()}
+INDEX_COORDINATES = {(index >> 3, index & 7): name for index, name in enumerate(SQUARE_NAMES)}
+
+# each square holds a small integer piece code: piece type in the low three bits, color in bit 3
+EMPTY = 0
+PAWN = 1
+ROOK = 2
+KNIGHT = 3
+BISHOP = 4
+QUEEN = 5
+KING = 6
+WHITE = 0
+BLACK = 8
+COLOR_BITS = {'white': WHITE, 'black': BLACK}
+
+# one-character board abbreviation for each piece code (' ' for empty)
+PIECE_LETTERS = ' PRNBQK  prnbqk '
+LETTER_CODES = {letter: code for code, letter in enumerate(PIECE_LETTERS) if letter != ' '}
+
+# every code a square may hold
+VALID_CODES = frozenset(LETTER_CODES.values()) | {EMPTY}
+
+GAME_STATES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+
+# reasons check_move gives for a move, in the order the checks are made; 'OK' means the move is legal
+MOVE_REASONS = ('GAME_OVER', 'INVALID_SQUARE', 'NO_MOVE', 'EMPTY_SQUARE', 'WRONG_TURN', 'OWN_PIECE_CAPTURE',
+                'ILLEGAL_GEOMETRY', 'BLOCKED_PATH', 'OK')
+
+# codes for the opening position, in square order
+START_SQUARES = bytes([
+    BLACK | ROOK, BLACK | KNIGHT, BLACK | BISHOP, BLACK | QUEEN,
+    BLACK | KING, BLACK | BISHOP, BLACK | KNIGHT, BLACK | ROOK,
+    *([BLACK | PAWN] * 8),
+    *([EMPTY] * 32),
+    *([WHITE | PAWN] * 8),
+    WHITE | ROOK, WHITE | KNIGHT, WHITE | BISHOP, WHITE | QUEEN,
+    WHITE | KING, WHITE | BISHOP, WHITE | KNIGHT, WHITE | ROOK,
+])
+
+CENTRAL_SQUARES = (SQUARE_NUMBERS['d4'], SQUARE_NUMBERS['d5'], SQUARE_NUMBERS['e4'], SQUARE_NUMBERS['e5'])
+HILL = frozenset(CENTRAL_SQUARES)
+
+# Zobrist keys: one random 64-bit number per (piece code, square) and one for black to move.
+# A fixed seed keeps position hashes identical across runs and processes, so they can be stored.
+_zobrist_random = random.Random(0x4B4F5448)
+ZOBRIST_PIECES = tuple(
+    tuple(0 if code == EMPTY else _zobrist_random.getrandbits(64) for square in range(64))
+    for code in range(16)
+)
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+
+def zobrist_hash(squares, color):
+    """
+    Receives a sequence of 64 piece codes and the color to move ('white' or 'black').
+    Returns the 64-bit Zobrist hash of the position.
+    """
+    position_hash = ZOBRIST_BLACK_TO_MOVE if color == 'black' else 0
+    for square in range(64):
+        position_hash ^= ZOBRIST_PIECES[squares[square]][square]
+    return position_hash
+
+
+START_HASH = zobrist_hash(START_SQUARES, 'white')
+
+# byte translation tables for nibble packing: shift a code into the high nibble, and take either nibble back out
+_HIGH_NIBBLE = bytes((value << 4) & 255 for value in range(256))
+_HIGH_HALF = bytes(value >> 4 for value in range(256))
+_LOW_HALF = bytes(value & 15 for value in range(256))
+
+
+def pack_squares(squares):
+    """
+    Receives a sequence of 64 piece codes.
+    Returns them as 32 bytes, two squares per byte: the even square in the high nibble, the odd square in the low.
+    """
+    squares = bytes(squares)
+    high = int.from_bytes(squares[0::2].translate(_HIGH_NIBBLE), 'big')
+    low = int.from_bytes(squares[1::2], 'big')
+    return (high | low).to_bytes(32, 'big')
+
+
+def unpack_squares(packed):
+    """
+    Receives 32 bytes from pack_squares. Returns the 64 piece codes as a bytearray.
+    """
+    packed = bytes(packed)
+    squares = bytearray(64)
+    squares[0::2] = packed.translate(_HIGH_HALF)
+    squares[1::2] = packed.translate(_LOW_HALF)
+    return squares
+
+
 class ChessPiece:
     """
     Represents a chess piece.
     Parent for all chess piece classes.
+    Pieces are immutable and know nothing about their square, so a single object per piece type and color
+    (see PIECES) is shared by every game. Each child class sets the class attributes _LETTER and _TYPE.
     """
+    __slots__ = ('_color', '_letter', 'abbreviation', 'color_bit', 'piece_type', 'code')
+
     def __init__(self, color):
         """
-        Initializes a ChessPiece object with a color attribute.
+        Initializes a ChessPiece object with its color and the precomputed attributes
+        abbreviation ('P' or 'p'), color_bit (WHITE or BLACK), piece_type (PAWN ... KING) and code.
+        """
+        color = color.lower()  # 'black' or 'white'
+        color_bit = WHITE if color == 'white' else BLACK
+
+        # uppercase for white, lowercase for black
+        abbreviation = self._LETTER.upper() if color_bit == WHITE else self._LETTER
+
+        initialize = object.__setattr__
+        initialize(self, '_color', color)
+        initialize(self, '_letter', self._LETTER)
+        initialize(self, 'abbreviation', abbreviation)
+        initialize(self, 'color_bit', color_bit)
+        initialize(self, 'piece_type', self._TYPE)
+        initialize(self, 'code', color_bit | self._TYPE)
+
+    def __setattr__(self, name, value):
+        """
+        Pieces are shared between games, so their attributes cannot be changed.
+        """
+        raise AttributeError(type(self).__name__ + ' objects are immutable')
+
+    def __delattr__(self, name):
+        """
+        Pieces are shared between games, so their attributes cannot be deleted.
+        """
+        raise AttributeError(type(self).__name__ + ' objects are immutable')
+
+    def __copy__(self):
+        """
+        Returns the piece itself: immutable objects need no copy.
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        """
+        Returns the piece itself: immutable objects need no copy.
         """
-        self._color = color.lower()  # 'black' or 'white'
+        return self
+
+    def __reduce__(self):
+        """
+        Pickles the piece as its code, so unpickling returns the shared object from PIECES.
+        """
+        return piece_for_code, (self.code,)
 
     def get_color(self):
         """
@@ -25,15 +178,7 @@ class ChessPiece:
         Returns a string abbreviation for the chess piece.
         Uppercase for white, lowercase for black.
         """
-        letter = self.get_letter()
-
-        # uppercase for white
-        if self.get_color() == 'white':
-            return letter.upper()
-
-        # lowercase for black
-        else:
-            return letter.lower()
+        return self.abbreviation
 
 
 class Pawn(ChessPiece):
@@ -41,13 +186,9 @@ class Pawn(ChessPiece):
     Represents a pawn.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a Pawn object with two private data members:
-        color, letter
-        """
-        super().__init__(color)
-        self._letter = 'p'
+    __slots__ = ()
+    _LETTER = 'p'
+    _TYPE = PAWN
 
     def get_letter(self):
         """
@@ -95,12 +236,9 @@ class Rook(ChessPiece):
     Represents a rook.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a Rook object with two private data members: color, letter.
-        """
-        super().__init__(color)
-        self._letter = 'r'
+    __slots__ = ()
+    _LETTER = 'r'
+    _TYPE = ROOK
 
     def get_letter(self):
         """
@@ -130,12 +268,9 @@ class Knight(ChessPiece):
     Represents a knight.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a Knight object with two private data members: color, letter.
-        """
-        super().__init__(color)
-        self._letter = 'n'
+    __slots__ = ()
+    _LETTER = 'n'
+    _TYPE = KNIGHT
 
     def get_letter(self):
         """
@@ -165,12 +300,9 @@ class Bishop(ChessPiece):
     Represents a bishop.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a Bishop object with two private data members: color, letter.
-        """
-        super().__init__(color)
-        self._letter = 'b'
+    __slots__ = ()
+    _LETTER = 'b'
+    _TYPE = BISHOP
 
     def get_letter(self):
         """
@@ -201,12 +333,9 @@ class Queen(ChessPiece):
     Represents a queen.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a Queen object with two private data members: color, letter.
-        """
-        super().__init__(color)
-        self._letter = 'q'
+    __slots__ = ()
+    _LETTER = 'q'
+    _TYPE = QUEEN
 
     def get_letter(self):
         """
@@ -240,12 +369,9 @@ class King(ChessPiece):
     Represents a king.
     Inherits from ChessPiece.
     """
-    def __init__(self, color):
-        """
-        Initializes a King object with two private data members: color, letter.
-        """
-        super().__init__(color)
-        self._letter = 'k'
+    __slots__ = ()
+    _LETTER = 'k'
+    _TYPE = KING
 
     def get_letter(self):
         """
@@ -268,116 +394,683 @@ class King(ChessPiece):
                 and (row_distance == 1 or col_distance == 1))
 
 
+# ---------------------------------------------------------------------------------------------------------
+# Bitboard tables. Bit n of a bitboard stands for square n (see SQUARE_NAMES), so 'a8' is bit 0.
+# ---------------------------------------------------------------------------------------------------------
+
+def _square_mask(row, col):
+    """
+    Receives a row and column.
+    Returns the single-bit mask for that square, or 0 if it is off the board.
+    """
+    if 0 <= row < 8 and 0 <= col < 8:
+        return 1 << (row * 8 + col)
+    return 0
+
+
+def _step_table(offsets):
+    """
+    Receives a list of (row, column) offsets.
+    Returns a tuple of 64 bitboards: the squares reachable from each square with one of the offsets.
+    """
+    table = []
+    for square in range(64):
+        mask = 0
+        for row_offset, col_offset in offsets:
+            mask |= _square_mask((square >> 3) + row_offset, (square & 7) + col_offset)
+        table.append(mask)
+    return tuple(table)
+
+
+KNIGHT_ATTACKS = _step_table([(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)])
+KING_ATTACKS = _step_table([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+
+# pawn tables indexed [color index][square]: white (index 0) moves up the board, black (index 1) moves down
+PAWN_PUSHES = (_step_table([(-1, 0)]), _step_table([(1, 0)]))
+PAWN_CAPTURES = (_step_table([(-1, -1), (-1, 1)]), _step_table([(1, -1), (1, 1)]))
+PAWN_DOUBLE_PUSHES = (
+    tuple(_square_mask(4, square & 7) if square >> 3 == 6 else 0 for square in range(64)),
+    tuple(_square_mask(3, square & 7) if square >> 3 == 1 else 0 for square in range(64)),
+)
+
+# sliding directions as (row, column) steps; the first four are the rook's, the last four the bishop's
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_DIRECTIONS = (0, 1, 2, 3)
+BISHOP_DIRECTIONS = (4, 5, 6, 7)
+QUEEN_DIRECTIONS = (0, 1, 2, 3, 4, 5, 6, 7)
+
+# a direction steps to higher square numbers unless it moves up the board, or left along a row
+POSITIVE_DIRECTIONS = tuple(row_step > 0 or (row_step == 0 and col_step > 0) for row_step, col_step in DIRECTIONS)
+
+
+def _ray_table(row_step, col_step):
+    """
+    Receives a (row, column) step.
+    Returns a tuple of 64 bitboards: every square from each square to the board edge in that direction.
+    """
+    table = []
+    for square in range(64):
+        mask = 0
+        row = (square >> 3) + row_step
+        col = (square & 7) + col_step
+        while 0 <= row < 8 and 0 <= col < 8:
+            mask |= 1 << (row * 8 + col)
+            row += row_step
+            col += col_step
+        table.append(mask)
+    return tuple(table)
+
+
+RAYS = tuple(_ray_table(row_step, col_step) for row_step, col_step in DIRECTIONS)
+
+
+def mask_squares(mask):
+    """
+    Receives a bitboard. Returns a tuple of the square numbers set in it, lowest first.
+    """
+    squares = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        squares.append(bit.bit_length() - 1)
+    return tuple(squares)
+
+
+# the same tables as square number tuples, for move generation on the squares themselves
+KNIGHT_SQUARES = tuple(mask_squares(mask) for mask in KNIGHT_ATTACKS)
+KING_SQUARES = tuple(mask_squares(mask) for mask in KING_ATTACKS)
+PAWN_CAPTURE_SQUARES = tuple(tuple(mask_squares(mask) for mask in table) for table in PAWN_CAPTURES)
+
+# ray squares ordered outward from the starting square
+RAY_SQUARES = tuple(
+    tuple(mask_squares(mask) if POSITIVE_DIRECTIONS[direction] else mask_squares(mask)[::-1] for mask in RAYS[direction])
+    for direction in range(8)
+)
+
+
+def _between_table():
+    """
+    Returns a tuple of 4096 bitboards indexed by from square * 64 + to square: the squares strictly between
+    the two if they share a row, column or diagonal, otherwise 0.
+    """
+    table = [0] * 4096
+    for from_square in range(64):
+        for direction in range(8):
+            passed = 0
+            for to_square in RAY_SQUARES[direction][from_square]:
+                table[from_square * 64 + to_square] = passed
+                passed |= 1 << to_square
+    return tuple(table)
+
+
+BETWEEN = _between_table()
+
+
+def occupancy(squares):
+    """
+    Receives a sequence of 64 piece codes. Returns the bitboard of occupied squares.
+    """
+    occupied = 0
+    for square in range(64):
+        if squares[square] != EMPTY:
+            occupied |= 1 << square
+    return occupied
+
+
+START_OCCUPIED = occupancy(START_SQUARES)
+START_PIECE_SQUARES = (frozenset(range(48, 64)), frozenset(range(16)))
+START_KING_SQUARES = (SQUARE_NUMBERS['e1'], SQUARE_NUMBERS['e8'])
+
+
+def sliding_attacks(square, occupied, directions):
+    """
+    Receives a square number, a bitboard of occupied squares and a tuple of direction indices.
+    Returns a bitboard of every square a sliding piece reaches, up to and including the first piece in each direction.
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+
+        if blockers:
+            # the nearest blocker is the lowest bit on rays that count up, the highest on rays that count down
+            if POSITIVE_DIRECTIONS[direction]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][blocker]
+
+        attacks |= ray
+    return attacks
+
+
+# the shared piece objects
+WHITE_PAWN = Pawn('white')
+WHITE_ROOK = Rook('white')
+WHITE_KNIGHT = Knight('white')
+WHITE_BISHOP = Bishop('white')
+WHITE_QUEEN = Queen('white')
+WHITE_KING = King('white')
+BLACK_PAWN = Pawn('black')
+BLACK_ROOK = Rook('black')
+BLACK_KNIGHT = Knight('black')
+BLACK_BISHOP = Bishop('black')
+BLACK_QUEEN = Queen('black')
+BLACK_KING = King('black')
+
+# piece object for each piece code (None for empty squares)
+PIECES = (
+    None, WHITE_PAWN, WHITE_ROOK, WHITE_KNIGHT, WHITE_BISHOP, WHITE_QUEEN, WHITE_KING, None,
+    None, BLACK_PAWN, BLACK_ROOK, BLACK_KNIGHT, BLACK_BISHOP, BLACK_QUEEN, BLACK_KING, None,
+)
+
+
+def piece_for_code(code):
+    """
+    Receives a piece code. Returns the shared ChessPiece object for it, or None for EMPTY.
+    """
+    return PIECES[code]
+
+
+def _geometry_table():
+    """
+    Returns a tuple indexed by piece code, then from square, of bitboards of the squares the piece's
+    legal_move method accepts (ignoring other pieces). Unused codes get a row of zeros.
+    The ChessPiece legal_move methods stay the reference; this table only caches their answers.
+    """
+    table = []
+    for code in range(16):
+        piece = PIECES[code]
+        rows = []
+        for from_square in range(64):
+            mask = 0
+            if piece is not None:
+                move_from = (from_square >> 3, from_square & 7)
+                for to_square in range(64):
+                    if to_square != from_square and piece.legal_move(move_from, (to_square >> 3, to_square & 7)):
+                        mask |= 1 << to_square
+            rows.append(mask)
+        table.append(tuple(rows))
+    return tuple(table)
+
+
+GEOMETRY = _geometry_table()
+
+
+class Bitboards:
+    """
+    Represents a position as twelve bitboards, one per piece code, plus one occupancy bitboard per color.
+    Used by ChessVar when created with backend='bitboard'. Follows the rules of ChessPiece and its child
+    classes exactly: no castling, en passant, promotion or check.
+    """
+    def __init__(self, squares):
+        """
+        Receives a sequence of 64 piece codes and initializes the bitboards from it.
+        """
+        self._pieces = [0] * 16     # indexed by piece code
+        self._colors = [0, 0]       # white, black
+        self.load(squares)
+
+    def load(self, squares):
+        """
+        Receives a sequence of 64 piece codes and replaces the bitboards with that position.
+        """
+        for code in range(16):
+            self._pieces[code] = 0
+        self._colors[0] = 0
+        self._colors[1] = 0
+
+        for square in range(64):
+            code = squares[square]
+            if code != EMPTY:
+                self._pieces[code] |= 1 << square
+                self._colors[code >> 3] |= 1 << square
+
+    def get_pieces(self, code):
+        """
+        Receives a piece code. Returns the bitboard of squares holding that piece.
+        """
+        return self._pieces[code]
+
+    def get_occupied(self):
+        """
+        Returns the bitboard of all occupied squares.
+        """
+        return self._colors[0] | self._colors[1]
+
+    def move(self, from_square, to_square, moving_code, captured_code):
+        """
+        Receives the squares moved from and to, the code of the moving piece and the code of the piece
+        on the destination square (EMPTY if none). Updates the bitboards to reflect the move.
+        """
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+
+        if captured_code != EMPTY:
+            self._pieces[captured_code] ^= to_bit
+            self._colors[captured_code >> 3] ^= to_bit
+
+        self._pieces[moving_code] ^= from_bit | to_bit
+        self._colors[moving_code >> 3] ^= from_bit | to_bit
+
+    def targets(self, from_square, code):
+        """
+        Receives a square number and the code of the piece on it.
+        Returns a bitboard of the squares that piece may move to, excluding squares holding its own color.
+        """
+        color = code >> 3
+        piece_type = code & 7
+        occupied = self._colors[0] | self._colors[1]
+
+        if piece_type == PAWN:
+            # one space forward is legal onto any square not held by its own color
+            targets = PAWN_PUSHES[color][from_square]
+
+            # two spaces forward from the starting row, only through and onto empty squares
+            double = PAWN_DOUBLE_PUSHES[color][from_square]
+            if double and not (targets | double) & occupied:
+                targets |= double
+
+            # diagonal moves must capture
+            targets |= PAWN_CAPTURES[color][from_square] & occupied
+
+        elif piece_type == KNIGHT:
+            targets = KNIGHT_ATTACKS[from_square]
+        elif piece_type == KING:
+            targets = KING_ATTACKS[from_square]
+        elif piece_type == ROOK:
+            targets = sliding_attacks(from_square, occupied, ROOK_DIRECTIONS)
+        elif piece_type == BISHOP:
+            targets = sliding_attacks(from_square, occupied, BISHOP_DIRECTIONS)
+        else:
+            targets = sliding_attacks(from_square, occupied, QUEEN_DIRECTIONS)
+
+        return targets & ~self._colors[color]
+
+    def pseudo_legal(self, from_square, to_square, code):
+        """
+        Receives the squares to move from and to and the code of the moving piece.
+        Returns True if the piece may make that move. Returns False otherwise.
+        """
+        return (self.targets(from_square, code) >> to_square) & 1 == 1
+
+    def generate_moves(self, color_bit):
+        """
+        Receives a color bit (WHITE or BLACK).
+        Returns a list of (from square, to square) tuples for every move available to that color.
+        """
+        moves = []
+        own = self._colors[color_bit >> 3]
+        pieces = own
+
+        while pieces:
+            from_bit = pieces & -pieces
+            pieces ^= from_bit
+            from_square = from_bit.bit_length() - 1
+
+            # find which piece code sits on this square
+            for code in range(color_bit | PAWN, (color_bit | KING) + 1):
+                if self._pieces[code] & from_bit:
+                    break
+
+            targets = self.targets(from_square, code)
+            while targets:
+                to_bit = targets & -targets
+                targets ^= to_bit
+                moves.append((from_square, to_bit.bit_length() - 1))
+
+        return moves
+
+
+def check_squares(squares, occupied, color, state, move_from, move_to, bitboards=None):
+    """
+    Receives a position (a sequence of 64 piece codes, its occupancy bitboard, the color to move and the game state),
+    two string coordinates for a move and optionally the position's Bitboards to check paths with.
+    Makes move_made's checks in order and returns a (reason, from square, to square) tuple, where reason is one of
+    MOVE_REASONS; the squares are numbers once they are known to be valid.
+    Shared by ChessVar and Position.
+    """
+    # if game is no longer in play
+    if state != 'UNFINISHED':
+        return 'GAME_OVER', None, None
+
+    # if 'move from' or 'move to' is invalid
+    from_square = SQUARE_LOOKUP.get(move_from)
+    to_square = SQUARE_LOOKUP.get(move_to)
+    if from_square is None or to_square is None:
+        return 'INVALID_SQUARE', from_square, to_square
+
+    # if no move is made
+    if from_square == to_square:
+        return 'NO_MOVE', from_square, to_square
+
+    # if 'move from' square is empty
+    moving_code = squares[from_square]
+    if moving_code == EMPTY:
+        return 'EMPTY_SQUARE', from_square, to_square
+
+    # if not current player's turn
+    color_bit = COLOR_BITS[color]
+    if moving_code & BLACK != color_bit:
+        return 'WRONG_TURN', from_square, to_square
+
+    # if player's own piece on the 'move to' square
+    captured_code = squares[to_square]
+    if captured_code != EMPTY and captured_code & BLACK == color_bit:
+        return 'OWN_PIECE_CAPTURE', from_square, to_square
+
+    # if move illegal for that piece (GEOMETRY caches each piece's legal_move answers)
+    if GEOMETRY[moving_code][from_square] >> to_square & 1 == 0:
+        return 'ILLEGAL_GEOMETRY', from_square, to_square
+
+    # if path not clear
+    if bitboards is not None:
+        if bitboards.pseudo_legal(from_square, to_square, moving_code) is False:
+            return 'BLOCKED_PATH', from_square, to_square
+
+    elif squares_path_clear(squares, occupied, from_square, to_square) is False:
+        return 'BLOCKED_PATH', from_square, to_square
+
+    return 'OK', from_square, to_square
+
+
+def squares_path_clear(squares, occupied, start_square, end_square):
+    """
+    Receives a sequence of 64 piece codes, its occupancy bitboard and two square numbers.
+    Returns True if the piece on the start square has a clear path to the end square (see ChessVar.path_clear).
+    Returns False otherwise.
+    """
+    piece_type = squares[start_square] & 7
+
+    # knights jump over pieces, so path is always clear
+    if piece_type == KNIGHT:
+        return True
+
+    if piece_type == PAWN:
+        vertical_distance = abs((end_square >> 3) - (start_square >> 3))
+
+        # exception: pawn diagonal capture needs a piece to be present
+        if abs((end_square & 7) - (start_square & 7)) == 1 and vertical_distance <= 1:
+            return squares[end_square] != EMPTY
+
+        # exception: pawns can move 2 spaces on first move but NOT to capture
+        if vertical_distance == 2:
+            return (BETWEEN[start_square * 64 + end_square] | 1 << end_square) & occupied == 0
+
+    return BETWEEN[start_square * 64 + end_square] & occupied == 0
+
+
+def squares_to_fen(squares, color, state):
+    """
+    Receives a sequence of 64 piece codes, the color to move and the game state.
+    Returns them as a string that ChessVar.from_fen accepts (see ChessVar.to_fen).
+    """
+    ranks = []
+    for row in range(8):
+        rank = ''
+        empty = 0
+        for square in range(row * 8, row * 8 + 8):
+            code = squares[square]
+            if code == EMPTY:
+                empty += 1
+            else:
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += PIECE_LETTERS[code]
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+
+    return '/'.join(ranks) + (' w ' if color == 'white' else ' b ') + state
+
+
 class ChessVar:
     """
     Represents the chess variant "King of the Hill".
     ChessVar will communicate with ChessPiece and all of its child classes to determine legal moves.
+    The position is stored as a bytearray of 64 piece codes (see SQUARE_NAMES); the dictionary and
+    nested list 'board' are views built from it on first request and then kept up to date.
     """
-    def __init__(self):
+    def __init__(self, backend='array'):
         """
         Initializes a ChessVar object.
+        Receives an optional backend name for move validation: 'array' (default) checks moves with the
+        ChessPiece classes, 'bitboard' checks them with precomputed attack tables. Both follow the same rules.
         """
+        if backend not in ('array', 'bitboard'):
+            raise ValueError('unknown backend: ' + repr(backend))
         # initial game state
         self._game_state = 'UNFINISHED'
 
         # initial chess piece color
         self._current_color = 'white'
 
-        # initiate all white ChessPiece objects
-        self._white_pawn = Pawn('white')
-        self._white_rook = Rook('white')
-        self._white_knight = Knight('white')
-        self._white_bishop = Bishop('white')
-        self._white_queen = Queen('white')
-        self._white_king = King('white')
-
-        # initiate all black ChessPiece objects
-        self._black_pawn = Pawn('black')
-        self._black_rook = Rook('black')
-        self._black_knight = Knight('black')
-        self._black_bishop = Bishop('black')
-        self._black_queen = Queen('black')
-        self._black_king = King('black')
-
-        # game board
-        self._chess_dict = {
-            'a8': self._black_rook,
-            'b8': self._black_knight,
-            'c8': self._black_bishop,
-            'd8': self._black_queen,
-            'e8': self._black_king,
-            'f8': self._black_bishop,
-            'g8': self._black_knight,
-            'h8': self._black_rook,
-            'a7': self._black_pawn,
-            'b7': self._black_pawn,
-            'c7': self._black_pawn,
-            'd7': self._black_pawn,
-            'e7': self._black_pawn,
-            'f7': self._black_pawn,
-            'g7': self._black_pawn,
-            'h7': self._black_pawn,
-            'a6': None,
-            'b6': None,
-            'c6': None,
-            'd6': None,
-            'e6': None,
-            'f6': None,
-            'g6': None,
-            'h6': None,
-            'a5': None,
-            'b5': None,
-            'c5': None,
-            'd5': None,
-            'e5': None,
-            'f5': None,
-            'g5': None,
-            'h5': None,
-            'a4': None,
-            'b4': None,
-            'c4': None,
-            'd4': None,
-            'e4': None,
-            'f4': None,
-            'g4': None,
-            'h4': None,
-            'a3': None,
-            'b3': None,
-            'c3': None,
-            'd3': None,
-            'e3': None,
-            'f3': None,
-            'g3': None,
-            'h3': None,
-            'a2': self._white_pawn,
-            'b2': self._white_pawn,
-            'c2': self._white_pawn,
-            'd2': self._white_pawn,
-            'e2': self._white_pawn,
-            'f2': self._white_pawn,
-            'g2': self._white_pawn,
-            'h2': self._white_pawn,
-            'a1': self._white_rook,
-            'b1': self._white_knight,
-            'c1': self._white_bishop,
-            'd1': self._white_queen,
-            'e1': self._white_king,
-            'f1': self._white_bishop,
-            'g1': self._white_knight,
-            'h1': self._white_rook,
-        }
-
-        # for testing purposes
-        self._board = [
-            ['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
-            ['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            ['P', 'P', 'P', 'P', 'P', 'P', 'P', 'P'],
-            ['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R']
-        ]
+        # shared white ChessPiece objects
+        self._white_pawn = WHITE_PAWN
+        self._white_rook = WHITE_ROOK
+        self._white_knight = WHITE_KNIGHT
+        self._white_bishop = WHITE_BISHOP
+        self._white_queen = WHITE_QUEEN
+        self._white_king = WHITE_KING
+
+        # shared black ChessPiece objects
+        self._black_pawn = BLACK_PAWN
+        self._black_rook = BLACK_ROOK
+        self._black_knight = BLACK_KNIGHT
+        self._black_bishop = BLACK_BISHOP
+        self._black_queen = BLACK_QUEEN
+        self._black_king = BLACK_KING
+
+        # ChessPiece object for each piece code
+        self._pieces = PIECES
+
+        # game board: one piece code per square
+        self._squares = bytearray(START_SQUARES)
+
+        # optional bitboard copy of the squares
+        self._backend = backend
+        self._bitboards = Bitboards(self._squares) if backend == 'bitboard' else None
+
+        # dictionary and nested list 'board' views, built on first request, and the read-only
+        # mapping of the dictionary that get_dictionary hands out
+        self._chess_dict = None
+        self._dictionary_view = None
+        self._board = None
+
+        # bitboard of occupied squares, for path checks
+        self._occupied = START_OCCUPIED
+
+        # squares holding each color's pieces and each color's king (None once captured), indexed white, black
+        self._piece_squares = [set(START_PIECE_SQUARES[0]), set(START_PIECE_SQUARES[1])]
+        self._king_squares = list(START_KING_SQUARES)
+
+        # 64-bit Zobrist hash of the squares and player to move, updated with each move
+        self._hash = START_HASH
+
+        # one (from square, to square, captured code, color, game state, hash) tuple per move made with make_move
+        # (or during a search), for unmake_move
+        self._undo_stack = []
+
+        # when True, every move cross-checks the views against the squares
+        self._debug = False
+
+
+    def __getstate__(self):
+        """
+        Returns the attributes to copy or pickle. The read-only dictionary view cannot be pickled,
+        so it is left out and rebuilt by __setstate__.
+        """
+        state = self.__dict__.copy()
+        state['_dictionary_view'] = None
+        return state
+
+
+    def __setstate__(self, state):
+        """
+        Receives the attributes from __getstate__ and restores them, rebuilding the read-only dictionary view.
+        """
+        self.__dict__.update(state)
+        if self._chess_dict is not None:
+            self._dictionary_view = MappingProxyType(self._chess_dict)
+
+
+    def reset(self):
+        """
+        Returns the game to the opening position with white to move, reusing the existing board objects.
+        Clears the moves remembered for unmake_move.
+        """
+        self._squares[:] = START_SQUARES
+        self._current_color = 'white'
+        self._game_state = 'UNFINISHED'
+        self._hash = START_HASH
+        self._occupied = START_OCCUPIED
+
+        for color_index in (0, 1):
+            self._piece_squares[color_index].clear()
+            self._piece_squares[color_index].update(START_PIECE_SQUARES[color_index])
+            self._king_squares[color_index] = START_KING_SQUARES[color_index]
+
+        self._refresh_derived()
+
+
+    def _set_position(self, squares, color, state):
+        """
+        Receives a sequence of 64 piece codes, the color to move and the game state, and replaces the position
+        with them in place: squares, hash, piece lists, bitboards and any built views are all updated,
+        and the undo stack is emptied.
+        """
+        self._squares[:] = squares
+        self._current_color = color
+        self._game_state = state
+        self._hash = zobrist_hash(self._squares, color)
+        self._occupied = occupancy(self._squares)
+        self._track_pieces()
+        self._refresh_derived()
+
+
+    def _refresh_derived(self):
+        """
+        Helper method for reset and _set_position: reloads the bitboards and any built views from the squares
+        and empties the undo stack.
+        """
+        if self._bitboards is not None:
+            self._bitboards.load(self._squares)
+
+        self._undo_stack.clear()
+
+        self.set_board()
+        if self._chess_dict is not None:
+            for index in range(64):
+                self._chess_dict[SQUARE_NAMES[index]] = self._pieces[self._squares[index]]
+
+
+    def _track_pieces(self):
+        """
+        Rebuilds the per-color piece square sets and king squares from the squares.
+        """
+        for color_index in (0, 1):
+            self._piece_squares[color_index].clear()
+            self._king_squares[color_index] = None
+
+        for square in range(64):
+            code = self._squares[square]
+            if code != EMPTY:
+                self._piece_squares[code >> 3].add(square)
+                if code & 7 == KING:
+                    self._king_squares[code >> 3] = square
+
+
+    @classmethod
+    def from_fen(cls, fen, backend='array'):
+        """
+        Receives a position string and an optional backend name.
+        The string has up to three space-separated fields: piece placement as in FEN (ranks 8 to 1 separated by
+        '/', digits for runs of empty squares), the color to move ('w' or 'b', default 'w') and the game state
+        (UNFINISHED, WHITE_WON or BLACK_WON, default UNFINISHED). Further fields of a standard FEN (castling,
+        en passant, move counters) are ignored, as is an unrecognised third field; the variant has none of them.
+        Returns a new ChessVar set to that position, or None if the string is invalid or either color has
+        more than one king.
+        """
+        fields = fen.split()
+        if not fields:
+            return None
+
+        squares = bytearray()
+        rank_end = 8
+        for letter in fields[0]:
+            if letter in LETTER_CODES:
+                squares.append(LETTER_CODES[letter])
+            elif '1' <= letter <= '8':
+                squares.extend(bytes(int(letter)))
+            elif letter == '/':
+                if len(squares) != rank_end:
+                    return None     # rank too short or too long
+                rank_end += 8
+            else:
+                return None         # unknown character
+
+        if len(squares) != 64 or rank_end != 64:
+            return None
+
+        if squares.count(WHITE | KING) > 1 or squares.count(BLACK | KING) > 1:
+            return None
+
+        color = 'white'
+        if len(fields) > 1:
+            if fields[1] not in ('w', 'b'):
+                return None
+            color = 'white' if fields[1] == 'w' else 'black'
+
+        state = 'UNFINISHED'
+        if len(fields) > 2 and fields[2] in GAME_STATES:
+            state = fields[2]
+
+        game = cls(backend=backend)
+        game._set_position(squares, color, state)
+        return game
+
+
+    def to_fen(self):
+        """
+        Returns the position as a string that from_fen accepts: FEN piece placement, the color to move
+        ('w' or 'b') and the game state, e.g. 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w UNFINISHED'.
+        """
+        return squares_to_fen(self._squares, self._current_color, self._game_state)
+
+
+    def snapshot(self):
+        """
+        Returns the position as 34 bytes that restore accepts: the 64 piece codes packed two per byte
+        (see pack_squares), then the color to move (0 white, 1 black) and the game state's index in GAME_STATES.
+        The views, piece lists and moves remembered for unmake_move are not included.
+        """
+        return pack_squares(self._squares) + bytes((
+            0 if self._current_color == 'white' else 1,
+            GAME_STATES.index(self._game_state),
+        ))
+
+
+    @classmethod
+    def restore(cls, blob, backend='array'):
+        """
+        Receives 34 bytes from snapshot and an optional backend name.
+        Returns a new ChessVar set to that position, or None if the bytes are not a valid snapshot.
+        """
+        if not isinstance(blob, (bytes, bytearray)) or len(blob) != 34:
+            return None
+        if blob[32] > 1 or blob[33] >= len(GAME_STATES):
+            return None
+
+        squares = unpack_squares(blob[:32])
+        if not VALID_CODES.issuperset(squares):
+            return None
+        if squares.count(WHITE | KING) > 1 or squares.count(BLACK | KING) > 1:
+            return None
+
+        game = cls(backend=backend)
+        game._set_position(squares, 'black' if blob[32] else 'white', GAME_STATES[blob[33]])
+        return game
 
 
     def get_game_state(self):
@@ -402,6 +1095,13 @@ class ChessVar:
         else: return None      # invalid state
 
 
+    def get_backend(self):
+        """
+        Returns the name of the move validation backend: 'array' or 'bitboard'.
+        """
+        return self._backend
+
+
     def get_board(self):
         """
         Returns a nested list representing the current game board.
@@ -414,24 +1114,102 @@ class ChessVar:
         k = king
         '' = empty square
         """
+        if self._board is None:
+            self._board = [[' '] * 8 for row in range(8)]
+            self.set_board()
+
         return self._board
 
 
     def set_board(self):
         """
-        Updates the nested list 'board' by iterating through the dictionary and transposing values.
-        No return value.
+        Rebuilds all 64 cells of the nested list 'board' from the squares.
+        Does nothing if the board has not been requested yet. No return value.
+        The squares are the only record of the position: the board and dictionary are views of them, so pieces
+        are moved with set_dictionary (or move_made), not by editing either view.
         """
+        if self._board is None:
+            return
 
-        for square in self._chess_dict:
-            index_tuple = self.string_to_index(square)
-            index_1 = index_tuple[0]
-            index_2 = index_tuple[1]
+        for square in range(64):
+            self._board[square >> 3][square & 7] = PIECE_LETTERS[self._squares[square]]
 
-            if self._chess_dict[square] is not None:
-                self._board[index_1][index_2] = self._chess_dict[square].get_abbreviation()
-            else:
-                self._board[index_1][index_2] = ' '
+
+    def update_board(self, move_from, move_to):
+        """
+        Receives two string arguments: the square moved from and the square moved to.
+        Updates only those two cells of the dictionary and nested list 'board' to match the squares.
+        Faster than set_board, which rebuilds all 64 cells. No return value.
+        """
+        self._update_views(SQUARE_NUMBERS[move_from], SQUARE_NUMBERS[move_to])
+
+
+    def _update_views(self, from_square, to_square):
+        """
+        Helper method for update_board and the move methods.
+        Receives two square numbers and copies those squares into the dictionary and nested list 'board', if built.
+        """
+        for index in (from_square, to_square):
+            code = self._squares[index]
+
+            if self._board is not None:
+                self._board[index >> 3][index & 7] = PIECE_LETTERS[code]
+
+            if self._chess_dict is not None:
+                self._chess_dict[SQUARE_NAMES[index]] = self._pieces[code]
+
+
+    def board_consistent(self):
+        """
+        Compares the dictionary, nested list 'board' and bitboards, if built, and the position hash with the squares.
+        Returns True if they agree. Returns False otherwise.
+        """
+        if self._hash != zobrist_hash(self._squares, self._current_color):
+            return False
+
+        if self._occupied != occupancy(self._squares):
+            return False
+
+        for color_index in (0, 1):
+            color_bit = color_index << 3
+            if self._piece_squares[color_index] != {square for square in range(64)
+                                                    if self._squares[square] != EMPTY
+                                                    and self._squares[square] & BLACK == color_bit}:
+                return False
+            king_square = self._king_squares[color_index]
+            if king_square is None:
+                if color_bit | KING in self._squares:
+                    return False
+            elif self._squares[king_square] != color_bit | KING:
+                return False
+
+        if self._bitboards is not None:
+            for code in range(16):
+                expected = 0
+                for index in range(64):
+                    if code != EMPTY and self._squares[index] == code:
+                        expected |= 1 << index
+                if code != EMPTY and self._bitboards.get_pieces(code) != expected:
+                    return False
+
+        for index in range(64):
+            code = self._squares[index]
+
+            if self._board is not None and self._board[index >> 3][index & 7] != PIECE_LETTERS[code]:
+                return False
+
+            if self._chess_dict is not None and self._chess_dict[SQUARE_NAMES[index]] is not self._pieces[code]:
+                return False
+
+        return True
+
+
+    def set_debug(self, enabled):
+        """
+        Receives a boolean as an argument.
+        When True, move_made verifies the board after every move and raises AssertionError on a mismatch.
+        """
+        self._debug = bool(enabled)
 
 
     def get_dictionary(self):
@@ -439,21 +1217,31 @@ class ChessVar:
         Returns dictionary representing the board.
         Each square of the board is represented as a key in string notation (e.g. 'A1').
         Values are either ChessPiece objects, representing the piece on the square, or None if empty.
+        The dictionary is a read-only view of the squares, kept up to date as moves are made: assigning to it
+        raises TypeError. Use set_dictionary to move a piece.
         """
-        return self._chess_dict
+        if self._chess_dict is None:
+            self._chess_dict = {SQUARE_NAMES[index]: self._pieces[self._squares[index]] for index in range(64)}
+            self._dictionary_view = MappingProxyType(self._chess_dict)
+
+        return self._dictionary_view
 
 
     def set_dictionary(self, move_from, move_to):
         """
         Receives two string arguments: the square to move from and the square to move to.
-        Updates the dictionary to reflect the move, so the object at move_from is ...
-        transferred to move_to, and move_from becomes 'None' to represent an empty square.
-        """
-        if move_from in self._chess_dict:
-            if move_to in self._chess_dict:
-                self._chess_dict[move_to] = self._chess_dict[move_from]   # 'move to' square now holds ChessPiece object
-                self._chess_dict[move_from] = None                        # 'move from' square now empty
-
+        Updates the squares to reflect the move, so the piece at move_from is ...
+        transferred to move_to, and move_from becomes empty.
+        Everything kept from the squares (hash, piece lists, bitboards and views) is updated to match
+        (see _set_position). The player to move and game state are unchanged; the moves remembered for
+        unmake_move are dropped, since they no longer lead to this position.
+        """
+        if move_from in SQUARE_NUMBERS:
+            if move_to in SQUARE_NUMBERS:
+                squares = bytearray(self._squares)
+                squares[SQUARE_NUMBERS[move_to]] = squares[SQUARE_NUMBERS[move_from]]   # 'move to' square now holds the piece
+                squares[SQUARE_NUMBERS[move_from]] = EMPTY                              # 'move from' square now empty
+                self._set_position(squares, self._current_color, self._game_state)
 
     def string_to_index(self, string_coordinate):
         """
@@ -461,325 +1249,244 @@ class ChessVar:
         Converts string into index on nested list 'board'.
         Returns tuple with two integers: converted letter and number of coordinate.
         Returns None if string coordinate is an invalid entry.
+        Uses the precomputed COORDINATE_INDEXES table; internal code uses SQUARE_LOOKUP directly.
         """
-        col_index = string_coordinate[0].lower()   # letter in coordinate
-        row_index = string_coordinate[1]           # number in coordinate
-
-        number_to_index = {
-            '1': 7,
-            '2': 6,
-            '3': 5,
-            '4': 4,
-            '5': 3,
-            '6': 2,
-            '7': 1,
-            '8': 0
-        }
-
-        if row_index in number_to_index:
-            row_index = number_to_index[row_index]      # convert number to index
-        else:
-            return None                                 # invalid row coordinate
-
-        letter_to_index = {
-            'a': 0,
-            'b': 1,
-            'c': 2,
-            'd': 3,
-            'e': 4,
-            'f': 5,
-            'g': 6,
-            'h': 7
-        }
-
-        if col_index in letter_to_index:
-            col_index = letter_to_index[col_index]      # convert letter to index
-            return row_index, col_index                 # return tuple
-        else:
-            return None                                 # invalid column coordinate
+        index_tuple = COORDINATE_INDEXES.get(string_coordinate)
+
+        # only the first two characters count, as in 'a1' of 'a1x'
+        if index_tuple is None and len(string_coordinate) > 2:
+            index_tuple = COORDINATE_INDEXES.get(string_coordinate[:2])
+
+        return index_tuple
 
 
     def index_to_string(self, index_tuple):
         """
         Receives a tuple containing two indices (from the nested list 'board') as an argument.
-        First (row) index will be converted to the letter portion of a coordinate in string notation.
-        Second (column) index will be converted to the number portion of a coordinate in string notation.
+        First (row) index will be converted to the number portion of a coordinate in string notation.
+        Second (column) index will be converted to the letter portion of a coordinate in string notation.
         Returns converted indices as a string. Returns None if indices are invalid entries.
+        Uses the precomputed INDEX_COORDINATES table.
         """
-        row_index = index_tuple[0]       # index to be converted to a number
-        col_index = index_tuple[1]       # index to be converted to a letter
-
-        index_to_number = {
-            7: '1',
-            6: '2',
-            5: '3',
-            4: '4',
-            3: '5',
-            2: '6',
-            1: '7',
-            0: '8'
-        }
-
-        if row_index in index_to_number:
-            row_index = index_to_number[row_index]      # convert row index to number
-        else:
-            return None                                 # invalid row index
-
-        index_to_letter = {
-            0: 'a',
-            1: 'b',
-            2: 'c',
-            3: 'd',
-            4: 'e',
-            5: 'f',
-            6: 'g',
-            7: 'h'
-        }
-
-        if col_index in index_to_letter:
-            col_index = index_to_letter[col_index]       # convert column index to letter
-            return col_index + row_index                 # return string
-        else:
-            return None                                  # invalid column index
+        return INDEX_COORDINATES.get((index_tuple[0], index_tuple[1]))
 
 
     def path_clear(self, move_from, move_to):
         """
         Receives two tuples as parameters, both with two indices corresponding to piece's position in nested list 'board'.
         Returns True if the path is clear to move. Returns False otherwise.
+        Looks up the squares in between in the precomputed BETWEEN table and tests them against the occupied squares.
         """
-        move_from_string = self.index_to_string(move_from)
-
-        # knights jump over pieces, so path is always clear
-        if isinstance(self._chess_dict[move_from_string], Knight) is True:
-            return True
+        return self._path_clear(move_from[0] * 8 + move_from[1], move_to[0] * 8 + move_to[1])
 
-        start_row = move_from[0]
-        start_col = move_from[1]
-        vertical_distance = move_to[0] - move_from[0]
-        horizontal_distance = move_to[1] - move_from[1]
 
-        # if moving only one space
-        if abs(vertical_distance) <= 1 and abs(horizontal_distance) <= 1:
-            return self._one_space_move(move_to, horizontal_distance, move_from_string)
-
-        # lateral moves
-        if vertical_distance == 0:
-            return self._lateral_move(start_row, start_col, horizontal_distance)
+    def _path_clear(self, start_square, end_square):
+        """
+        Helper method for path_clear and move_made. Same as path_clear, but receives two square numbers.
+        """
+        return squares_path_clear(self._squares, self._occupied, start_square, end_square)
 
-        # vertical moves
-        elif horizontal_distance == 0:
-           return self._vertical_move(start_row, start_col, vertical_distance, move_from_string)
 
-        # diagonal moves
-        elif abs(horizontal_distance) == abs(vertical_distance):
-            return self._diagonal_move(start_row, start_col, horizontal_distance, vertical_distance)
+    def position_hash(self):
+        """
+        Returns a 64-bit integer identifying the pieces on the board and the player to move.
+        Equal positions always have equal hashes; the game state is not included.
+        """
+        return self._hash
 
 
-    def _one_space_move(self, move_to, horizontal_distance, move_from_string):
+    def _packed_squares(self):
         """
-        Helper method for path_clear that handles single space move logic.
-        Receives the square to move to, horizontal distance, and starting square coordinates as arguments.
-        Returns True if path is clear. Returns False otherwise.
+        Returns the board as 32 bytes, two piece codes per byte (see pack_squares).
         """
-        # exception: pawn diagonal capture
-        if (isinstance(self._chess_dict[move_from_string], Pawn)
-                and abs(horizontal_distance) == 1):               # only time pawns move horizontally
-
-            move_to_string = self.index_to_string(move_to)
-            return self._chess_dict[move_to_string] is not None   # a piece must be present to capture
+        return pack_squares(self._squares)
 
-        # path clear!
-        return True
 
-    def _lateral_move(self, start_row, start_col, horizontal_distance):
+    def legal_moves(self):
         """
-        Helper method for path_clear that handles lateral move logic.
-        Receives the starting row, starting column, and horizontal distance as arguments.
-        Returns True if path is clear. Returns False otherwise.
+        Returns a list of (move from, move to) string tuples for every move the current player may make,
+        e.g. ('e2', 'e4'). Each of them would be accepted by move_made. Returns an empty list if the game is over.
         """
-        # loop helper variables
-        checking_row = start_row
-        checking_col = start_col
+        return [(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]) for from_square, to_square in self._generate_moves()]
 
-        # moving left
-        if horizontal_distance < 0:
 
-            for step in range(0, abs(horizontal_distance) - 1):
-                checking_col -= 1    # move to next position to check
-                current_square = self.index_to_string((checking_row, checking_col))
+    def legal_moves_from(self, square):
+        """
+        Receives a string coordinate (e.g. 'e2') as an argument.
+        Returns a list of (move from, move to) string tuples for every move the piece on that square may make.
+        Returns an empty list if the square is invalid or empty, holds the opponent's piece, or the game is over.
+        """
+        from_square = SQUARE_LOOKUP.get(square)
+        if from_square is None or self._game_state != 'UNFINISHED':
+            return []
 
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
+        code = self._squares[from_square]
+        if code == EMPTY or code & BLACK != COLOR_BITS[self._current_color]:
+            return []
 
-        # moving right
+        moves = []
+        if self._bitboards is not None:
+            for to_square in mask_squares(self._bitboards.targets(from_square, code)):
+                moves.append((from_square, to_square))
         else:
-            for step in range(0, horizontal_distance - 1):
-                checking_col += 1    # move to next position to check
-                current_square = self.index_to_string((checking_row, checking_col))
+            self._piece_moves(from_square, code, moves)
 
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
+        return [(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]) for from_square, to_square in moves]
 
-        # path clear!
-        return True
 
-    def _vertical_move(self, start_row, start_col, vertical_distance, move_from_string):
+    def perft(self, depth):
         """
-        Helper method for path_clear that handles vertical move logic.
-        Receives the starting row, starting column, vertical distance, and starting square coordinates as arguments.
-        Returns True if path is clear. Returns False otherwise.
+        Receives a depth (number of moves ahead).
+        Returns the number of move sequences of exactly that length that can be played from this position;
+        sequences cut short by a win are not counted. The position is unchanged afterwards.
         """
-        # loop helper variables
-        checking_row = start_row
-        checking_col = start_col
-
-        # exception: pawns can move 2 spaces on first move but NOT to capture
-        if isinstance(self._chess_dict[move_from_string], Pawn) is True:
+        if depth == 0:
+            return 1
 
-            # white pawns moving up the board
-            if self._chess_dict[move_from_string].get_color() == 'white':
-                for step in range(0, abs(vertical_distance)):
-                    checking_row -= 1    # move to next position to check
-                    current_square = self.index_to_string((checking_row, checking_col))
+        moves = self._generate_moves()
+        if depth == 1:
+            return len(moves)
 
-                    # path not clear
-                    if self._chess_dict[current_square] is not None:
-                        return False
+        count = 0
+        for from_square, to_square in moves:
+            self._make(from_square, to_square)
+            count += self.perft(depth - 1)
+            self._unmake()
 
-            # black pawns moving down the board
-            else:
-                for step in range(0, vertical_distance):
-                    checking_row += 1    # move to next position to check
-                    current_square = self.index_to_string((checking_row, checking_col))
-
-                    # path not clear
-                    if self._chess_dict[current_square] is not None:
-                        return False
-
-        # moving up the board
-        elif vertical_distance < 0:
-            for step in range(0, abs(vertical_distance) - 1):
-                checking_row -= 1  # move to next position to check
-                current_square = self.index_to_string((checking_row, checking_col))
-
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
-
-        # moving down the board
-        else:
-            for step in range(0, vertical_distance - 1):
-                checking_row += 1  # move to next position to check
-                current_square = self.index_to_string((checking_row, checking_col))
+        return count
 
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
-
-        # path clear!
-        return True
 
-    def _diagonal_move(self, start_row, start_col, horizontal_distance, vertical_distance):
+    def _generate_moves(self):
         """
-        Helper method for path_clear that handles diagonal move logic.
-        Receives the starting row, starting column, horizontal distance, and vertical distance as arguments.
-        Returns True if path is clear. Returns False otherwise.
+        Returns a list of (from square, to square) number tuples for every move the current player may make.
+        Returns an empty list if the game is over.
         """
-        # loop helper variables
-        checking_row = start_row
-        checking_col = start_col
-
-        # moving bottom-up, left-to-right
-        if vertical_distance < 0 < horizontal_distance:
-
-            for step in range(0, horizontal_distance - 1):
-                checking_row -= 1    # move to next position to check
-                checking_col += 1
-                current_square = self.index_to_string((checking_row, checking_col))
-
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
+        if self._game_state != 'UNFINISHED':
+            return []
 
-        # moving top-down, right-to-left
-        elif vertical_distance > 0 > horizontal_distance:
+        color_bit = COLOR_BITS[self._current_color]
 
-            for step in range(0, vertical_distance - 1):
-                checking_row += 1    # move to next position to check
-                checking_col -= 1
-                current_square = self.index_to_string((checking_row, checking_col))
+        if self._bitboards is not None:
+            return self._bitboards.generate_moves(color_bit)
 
-                # path not clear
-                if self._chess_dict[current_square] is not None:
-                    return False
+        moves = []
+        squares = self._squares
+        for from_square in self._piece_squares[color_bit >> 3]:
+            self._piece_moves(from_square, squares[from_square], moves)
 
-        elif vertical_distance == horizontal_distance:
+        return moves
 
-            # moving bottom-up, right-to-left
-            if vertical_distance < 0:
 
-                for step in range(0, abs(vertical_distance) - 1):
-                    checking_row -= 1    # move to next position to check
-                    checking_col -= 1
-                    current_square = self.index_to_string((checking_row, checking_col))
+    def _piece_moves(self, from_square, code, moves):
+        """
+        Helper method for move generation.
+        Receives a square number, the code of the piece on it and a list.
+        Appends a (from square, to square) tuple to the list for every move that piece may make,
+        following the same rules as the ChessPiece legal_move methods and path_clear.
+        """
+        squares = self._squares
+        color_bit = code & BLACK
+        piece_type = code & 7
 
-                    # path not clear
-                    if self._chess_dict[current_square] is not None:
-                        return False
+        if piece_type == PAWN:
+            row = from_square >> 3
 
-            # moving top-down, left-to-right
-            elif vertical_distance > 0:
+            # white pawns move "up" (decreasing row numbers) and start on row 6
+            if color_bit == WHITE:
+                step = -8
+                on_starting_row = row == 6
+                can_advance = row > 0
 
-                for step in range(0, vertical_distance - 1):
-                    checking_row += 1    # move to next position to check
-                    checking_col += 1
-                    current_square = self.index_to_string((checking_row, checking_col))
+            # black pawns move "down" (increasing row numbers) and start on row 1
+            else:
+                step = 8
+                on_starting_row = row == 1
+                can_advance = row < 7
+
+            if can_advance:
+                # one space forward may land on any square not held by the player
+                to_square = from_square + step
+                target = squares[to_square]
+                if target == EMPTY or target & BLACK != color_bit:
+                    moves.append((from_square, to_square))
+
+                # two spaces forward on the first move, only through and onto empty squares
+                if on_starting_row and target == EMPTY and squares[to_square + step] == EMPTY:
+                    moves.append((from_square, to_square + step))
+
+            # diagonal moves must capture
+            for to_square in PAWN_CAPTURE_SQUARES[color_bit >> 3][from_square]:
+                target = squares[to_square]
+                if target != EMPTY and target & BLACK != color_bit:
+                    moves.append((from_square, to_square))
+
+        elif piece_type == KNIGHT or piece_type == KING:
+            table = KNIGHT_SQUARES if piece_type == KNIGHT else KING_SQUARES
+
+            for to_square in table[from_square]:
+                target = squares[to_square]
+                if target == EMPTY or target & BLACK != color_bit:
+                    moves.append((from_square, to_square))
 
-                    # path not clear
-                    if self._chess_dict[current_square] is not None:
-                        return False
+        else:
+            if piece_type == ROOK:
+                directions = ROOK_DIRECTIONS
+            elif piece_type == BISHOP:
+                directions = BISHOP_DIRECTIONS
+            else:
+                directions = QUEEN_DIRECTIONS
 
-        # path clear!
-        return True
+            # slide outward until the first piece, which may be captured if it is the opponent's
+            for direction in directions:
+                for to_square in RAY_SQUARES[direction][from_square]:
+                    target = squares[to_square]
+                    if target == EMPTY:
+                        moves.append((from_square, to_square))
+                    else:
+                        if target & BLACK != color_bit:
+                            moves.append((from_square, to_square))
+                        break
 
 
     def king_captured(self):
         """
-        Checks dictionary for the king.
+        Checks the tracked king squares for the opponent's king.
         Returns True if king is absent and has been captured.
         Returns False otherwise.
         """
         # white player captures black king
         if self._current_color == 'white':
-            king = self._black_king
+            return self._king_squares[1] is None
 
         # black player captures white king
         else:
-            king = self._white_king
-
-        for square in self._chess_dict:
-            if self._chess_dict[square] == king:
-                return False      # king not yet captured
-
-        return True               # king captured
+            return self._king_squares[0] is None
 
 
     def king_on_central_squares(self):
         """
-        Checks central squares (d4, d5, e4, e5) in dictionary for the king.
+        Checks whether either tracked king square is a central square (d4, d5, e4, e5).
         Returns True if king is on the four central squares.
         Returns False otherwise.
         """
-        central_squares = ['d4', 'd5', 'e4', 'e5']
+        return self._king_squares[0] in HILL or self._king_squares[1] in HILL
 
-        for square in central_squares:
-            if isinstance(self._chess_dict[square], King) is True:
-                return True    # king found on central squares
 
-        return False           # king not on central squares
+    def get_king_square(self, color):
+        """
+        Receives a color ('white' or 'black').
+        Returns that color's king square as a string coordinate (e.g. 'e1'), or None if the king has been captured.
+        """
+        king_square = self._king_squares[COLOR_BITS[color] >> 3]
+        return None if king_square is None else SQUARE_NAMES[king_square]
+
+
+    def get_piece_squares(self, color):
+        """
+        Receives a color ('white' or 'black').
+        Returns a sorted list of the string coordinates of that color's pieces.
+        """
+        return [SQUARE_NAMES[square] for square in sorted(self._piece_squares[COLOR_BITS[color] >> 3])]
 
 
     def move_made(self, move_from, move_to):
@@ -789,59 +1496,111 @@ class ChessVar:
    	    if move is legal with the given chess piece, if any pieces are in the way and if it would result in any
         captures. If legal: updates the board, updates the ChessPiece object coordinates, and returns True.
         Otherwise, returns False.
+        The move is not remembered for unmake_move (see make_move), so long games keep no move history;
+        moves remembered earlier are forgotten, since they could no longer be taken back in order.
         """
-        move_from = move_from.lower()
-        move_to = move_to.lower()
+        return self.attempt_move(move_from, move_to) == 'OK'
 
-        starting_square = self.string_to_index(move_from)
-        final_square = self.string_to_index(move_to)
 
-        # if game is no longer in play
-        if self._game_state != 'UNFINISHED':
-            return False
+    def attempt_move(self, move_from, move_to):
+        """
+        Receives two string arguments: the square to move from and the square to move to.
+        Same as move_made, but returns why the move was rejected, as one of MOVE_REASONS, or 'OK' if it was made.
+        """
+        reason, from_square, to_square = self._check_move(move_from, move_to)
+        if reason != 'OK':
+            return reason
 
-        # if no move is made
-        if move_from == move_to:
-            return False
+        self._make(from_square, to_square)
+        self._undo_stack.clear()
 
-        # if 'move from' is invalid
-        if move_from not in self._chess_dict:
-            return False
+        # move has been made
+        return reason
 
-        # if 'move to' is invalid
-        if move_to not in self._chess_dict:
-            return False
 
-        # if 'move from' square is empty
-        moving_piece = self._chess_dict[move_from]
-        if moving_piece is None:
-            return False
+    def check_move(self, move_from, move_to):
+        """
+        Receives two string arguments: the square to move from and the square to move to.
+        Returns why move_made would reject the move, as one of MOVE_REASONS, or 'OK' if it would make it.
+        The board is not changed.
+        """
+        return self._check_move(move_from, move_to)[0]
 
-        # if not current player's turn
-        if self._current_color != moving_piece.get_color():
-            return False
 
-        # when capturing
-        captured_piece = self._chess_dict[move_to]
-        if captured_piece is not None:
+    def _check_move(self, move_from, move_to):
+        """
+        Helper method for move_made and check_move: makes move_made's checks in order (see check_squares).
+        Returns a (reason, from square, to square) tuple; the squares are numbers once they are known to be valid.
+        """
+        return check_squares(self._squares, self._occupied, self._current_color, self._game_state,
+                             move_from, move_to, self._bitboards)
 
-            # if player's own piece on the 'move to' square
-            if captured_piece.get_color() == self._current_color:
-                return False
 
-        # if move illegal for that piece
-        if moving_piece.legal_move(starting_square, final_square) is False:
+    def make_move(self, move_from, move_to):
+        """
+        Receives two string arguments: the square to move from and the square to move to.
+        Same as move_made, but the move is remembered so unmake_move can take it back.
+        Returns True if the move was made, False otherwise.
+        """
+        reason, from_square, to_square = self._check_move(move_from, move_to)
+        if reason != 'OK':
             return False
 
-        # if path not clear
-        if self.path_clear(starting_square, final_square) is False:
+        self._make(from_square, to_square)
+        return True
+
+
+    def unmake_move(self):
+        """
+        Takes back the most recent move made with make_move, restoring the captured piece, the player to move
+        and the game state.
+        Returns True if a move was taken back. Returns False if no moves have been made.
+        """
+        if not self._undo_stack:
             return False
 
-        # updates dictionary of current play
-        self.set_dictionary(move_from, move_to)
+        self._unmake()
+        return True
 
-        # dictionary updates nested list 'board'
-        self.set_board()
+
+    def _make(self, from_square, to_square):
+        """
+        Receives two square numbers for a move already known to be legal and makes it:
+        updates the squares and views, records the move for unmake_move, checks win conditions and switches players.
+        """
+        squares = self._squares
+        moving_code = squares[from_square]
+        captured_code = squares[to_square]
+
+        self._undo_stack.append((from_square, to_square, captured_code, self._current_color, self._game_state, self._hash))
+
+        # updates squares of current play
+        squares[to_square] = moving_code
+        squares[from_square] = EMPTY
+
+        self._occupied = (self._occupied ^ 1 << from_square) | 1 << to_square
+
+        # updates the piece lists
+        pieces = self._piece_squares[moving_code >> 3]
+        pieces.remove(from_square)
+        pieces.add(to_square)
+        if captured_code != EMPTY:
+            self._piece_squares[captured_code >> 3].remove(to_square)
+            if captured_code & 7 == KING:
+                self._king_squares[captured_code >> 3] = None
+        if moving_code & 7 == KING:
+            self._king_squares[moving_code >> 3] = to_square
+
+        # moves the piece in the hash, removes any captured piece and flips the player to move
+        moving_keys = ZOBRIST_PIECES[moving_code]
+        self._hash ^= (moving_keys[from_square] ^ moving_keys[to_square]
+                       ^ ZOBRIST_PIECES[captured_code][to_square] ^ ZOBRIST_BLACK_TO_MOVE)
+
+        if self._bitboards is not None:
+            self._bitboards.move(from_square, to_square, moving_code, captured_code)
+
+        # squares update the two changed cells of the dictionary and nested list 'board'
+        self._update_views(from_square, to_square)
 
         # check win conditions
         if self.king_captured() is True or self.king_on_central_squares() is True:
@@ -861,5 +1620,269 @@ class ChessVar:
         else:
             self._current_color = 'white'
 
-        # move has been made
-        return True
\ No newline at end of file
+        if self._debug is True and self.board_consistent() is False:
+            raise AssertionError('board out of sync with squares after ' + SQUARE_NAMES[from_square] + SQUARE_NAMES[to_square])
+
+
+    def _unmake(self):
+        """
+        Reverses the move on top of the undo stack, which must not be empty.
+        """
+        (from_square, to_square, captured_code,
+         self._current_color, self._game_state, self._hash) = self._undo_stack.pop()
+
+        squares = self._squares
+        moving_code = squares[to_square]
+        squares[from_square] = moving_code
+        squares[to_square] = captured_code
+
+        self._occupied |= 1 << from_square
+        if captured_code == EMPTY:
+            self._occupied ^= 1 << to_square
+
+        pieces = self._piece_squares[moving_code >> 3]
+        pieces.remove(to_square)
+        pieces.add(from_square)
+        if captured_code != EMPTY:
+            self._piece_squares[captured_code >> 3].add(to_square)
+            if captured_code & 7 == KING:
+                self._king_squares[captured_code >> 3] = to_square
+        if moving_code & 7 == KING:
+            self._king_squares[moving_code >> 3] = from_square
+
+        # bitboard moves are exclusive-ors, so repeating the move reverses it
+        if self._bitboards is not None:
+            self._bitboards.move(from_square, to_square, moving_code, captured_code)
+
+        self._update_views(from_square, to_square)
+
+
+class Position:
+    """
+    Represents one "King of the Hill" position as an immutable value: the 64 piece codes (as bytes),
+    the color to move and the game state. play returns the position after a move as a new Position and leaves
+    the original unchanged, so positions can be shared between threads and used as dictionary keys.
+    Equal positions (same squares, color to move and game state) compare equal and hash alike.
+    """
+    __slots__ = ('_squares', '_color', '_state', '_hash', '_occupied')
+
+    def __init__(self, squares=START_SQUARES, color='white', state='UNFINISHED'):
+        """
+        Initializes a Position from a sequence of 64 piece codes (see SQUARE_NAMES), the color to move and the
+        game state; by default the opening position with white to move.
+        Raises ValueError if a piece code is invalid, there are not 64 squares, either color has more than one
+        king, or the color or game state is unknown.
+        """
+        if isinstance(squares, int):
+            raise ValueError('squares must be a sequence of 64 piece codes')
+        squares = bytes(squares)
+
+        if len(squares) != 64 or not VALID_CODES.issuperset(squares):
+            raise ValueError('squares must be a sequence of 64 piece codes')
+        if squares.count(WHITE | KING) > 1 or squares.count(BLACK | KING) > 1:
+            raise ValueError('a color has more than one king')
+        if color not in COLOR_BITS:
+            raise ValueError('unknown color: ' + repr(color))
+        if state not in GAME_STATES:
+            raise ValueError('unknown game state: ' + repr(state))
+
+        self._initialize(squares, color, state, zobrist_hash(squares, color), occupancy(squares))
+
+    def _initialize(self, squares, color, state, position_hash, occupied):
+        """
+        Helper method for __init__ and _new: sets the attributes, which cannot be changed afterwards.
+        """
+        initialize = object.__setattr__
+        initialize(self, '_squares', squares)
+        initialize(self, '_color', color)
+        initialize(self, '_state', state)
+        initialize(self, '_hash', position_hash)
+        initialize(self, '_occupied', occupied)
+
+    @classmethod
+    def _new(cls, squares, color, state, position_hash, occupied):
+        """
+        Helper method for play and from_game: returns a Position built from parts already known to be valid,
+        without checking them or recomputing the hash.
+        """
+        position = object.__new__(cls)
+        position._initialize(squares, color, state, position_hash, occupied)
+        return position
+
+    def __setattr__(self, name, value):
+        """
+        Positions are values shared between threads and cache keys, so their attributes cannot be changed.
+        """
+        raise AttributeError(type(self).__name__ + ' objects are immutable')
+
+    def __delattr__(self, name):
+        """
+        Positions are values shared between threads and cache keys, so their attributes cannot be deleted.
+        """
+        raise AttributeError(type(self).__name__ + ' objects are immutable')
+
+    def __copy__(self):
+        """
+        Returns the position itself: immutable objects need no copy.
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        """
+        Returns the position itself: immutable objects need no copy.
+        """
+        return self
+
+    def __reduce__(self):
+        """
+        Pickles the position as its squares, color to move and game state.
+        """
+        return Position, (self._squares, self._color, self._state)
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self._hash == other._hash and self._squares == other._squares
+                and self._color == other._color and self._state == other._state)
+
+    def __hash__(self):
+        return hash((self._hash, self._state))
+
+    def __repr__(self):
+        return 'Position.from_fen(' + repr(self.to_fen()) + ')'
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Receives a ChessVar object. Returns a Position holding its current position; the game is not changed.
+        """
+        return cls._new(bytes(game._squares), game._current_color, game._game_state, game._hash, game._occupied)
+
+    def to_game(self, backend='array'):
+        """
+        Receives an optional ChessVar backend name.
+        Returns a new ChessVar set to this position, with no moves to take back.
+        """
+        game = ChessVar(backend=backend)
+        game._set_position(self._squares, self._color, self._state)
+        return game
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Receives a position string (see ChessVar.from_fen).
+        Returns a Position for it, or None if the string is invalid.
+        """
+        game = ChessVar.from_fen(fen)
+        if game is None:
+            return None
+        return cls.from_game(game)
+
+    def to_fen(self):
+        """
+        Returns the position as a string that from_fen accepts (see ChessVar.to_fen).
+        """
+        return squares_to_fen(self._squares, self._color, self._state)
+
+    @classmethod
+    def restore(cls, blob):
+        """
+        Receives 34 bytes from snapshot (or ChessVar.snapshot).
+        Returns a Position for them, or None if the bytes are not a valid snapshot.
+        """
+        game = ChessVar.restore(blob)
+        if game is None:
+            return None
+        return cls.from_game(game)
+
+    def snapshot(self):
+        """
+        Returns the position as 34 bytes (see ChessVar.snapshot).
+        """
+        return pack_squares(self._squares) + bytes((
+            0 if self._color == 'white' else 1,
+            GAME_STATES.index(self._state),
+        ))
+
+    def get_squares(self):
+        """
+        Returns the 64 piece codes as bytes, in square order (see SQUARE_NAMES).
+        """
+        return self._squares
+
+    def get_current_color(self):
+        """
+        Returns the color to move: 'white' or 'black'.
+        """
+        return self._color
+
+    def get_game_state(self):
+        """
+        Returns string representing the game state.
+        3 options: UNFINISHED, WHITE_WON, BLACK_WON.
+        """
+        return self._state
+
+    def position_hash(self):
+        """
+        Returns the 64-bit Zobrist hash of the pieces and player to move (see ChessVar.position_hash).
+        """
+        return self._hash
+
+    def get_piece(self, square):
+        """
+        Receives a string coordinate (e.g. 'e2').
+        Returns the ChessPiece object on that square, or None if the square is empty or invalid.
+        """
+        index = SQUARE_LOOKUP.get(square)
+        if index is None:
+            return None
+        return PIECES[self._squares[index]]
+
+    def check_move(self, move_from, move_to):
+        """
+        Receives two string arguments: the square to move from and the square to move to.
+        Returns why play would reject the move, as one of MOVE_REASONS, or 'OK' if it would make it.
+        """
+        return check_squares(self._squares, self._occupied, self._color, self._state, move_from, move_to)[0]
+
+    def legal_moves(self):
+        """
+        Returns a list of (move from, move to) string tuples for every move the player to move may make
+        (see ChessVar.legal_moves).
+        """
+        return self.to_game().legal_moves()
+
+    def play(self, move_from, move_to):
+        """
+        Receives two string arguments: the square to move from and the square to move to.
+        Makes the same checks as ChessVar.move_made. If the move is legal, returns the Position after it, with the
+        other player to move and the game state updated; this position is not changed.
+        Otherwise, returns None.
+        """
+        reason, from_square, to_square = check_squares(self._squares, self._occupied, self._color, self._state,
+                                                       move_from, move_to)
+        if reason != 'OK':
+            return None
+
+        squares = bytearray(self._squares)
+        moving_code = squares[from_square]
+        captured_code = squares[to_square]
+        squares[to_square] = moving_code
+        squares[from_square] = EMPTY
+
+        occupied = (self._occupied ^ 1 << from_square) | 1 << to_square
+
+        # moves the piece in the hash, removes any captured piece and flips the player to move (as ChessVar._make)
+        moving_keys = ZOBRIST_PIECES[moving_code]
+        position_hash = (self._hash ^ moving_keys[from_square] ^ moving_keys[to_square]
+                         ^ ZOBRIST_PIECES[captured_code][to_square] ^ ZOBRIST_BLACK_TO_MOVE)
+
+        # check win conditions: the opponent's king is captured, or either king stands on a central square
+        state = self._state
+        opponent_king = KING | (BLACK if self._color == 'white' else WHITE)
+        if opponent_king not in squares or any(squares[square] & 7 == KING for square in CENTRAL_SQUARES):
+            state = 'WHITE_WON' if self._color == 'white' else 'BLACK_WON'
+
+        color = 'black' if self._color == 'white' else 'white'
+        return Position._new(bytes(squares), color, state, position_hash, occupied)
@@ -0,0 +1,100 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_book.py
+
+import os
+import tempfile
+import unittest
+from chess_var import ChessVar
+from chess_records import write_games
+from chess_book import OpeningBook, BookMove, build_book
+from chess_search import Searcher
+from test_fixtures import KING_WALK, KING_CAPTURE, play
+
+
+class TestOpeningBook(unittest.TestCase):
+    """
+    Test cases for building and probing the opening book
+    """
+
+    def setUp(self):
+        """
+        Writes a small game record file and builds a book from its first four moves
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.directory.name, 'book.koth')
+        record_path = os.path.join(self.directory.name, 'games.koth')
+
+        games = [KING_WALK, KING_WALK, KING_CAPTURE, [['e2', 'e4'], ['e7', 'e5']], [['a2', 'a5'], ['a7', 'a6']]]
+        write_games(record_path, games)
+        self.entries = build_book(self.book_path, record_path, max_plies=4)
+
+    def tearDown(self):
+        """
+        Removes the temporary directory
+        """
+        self.directory.cleanup()
+
+    def test_probe(self):
+        """
+        Test the moves and results found for positions in the book
+        """
+        self.assertEqual(self.entries, 9)
+
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.get_count(), 9)
+            self.assertEqual(book.probe(ChessVar()), [BookMove('e2', 'e4', 3, 2, 0), BookMove('f2', 'f3', 1, 0, 1)])
+            self.assertEqual(book.probe(play(KING_WALK[:3])), [BookMove('a7', 'a6', 2, 2, 0)])
+            self.assertEqual(book.probe(play([['e2', 'e4']])),
+                             [BookMove('d7', 'd5', 2, 2, 0), BookMove('e7', 'e5', 1, 0, 0)])
+
+            # past max_plies, and a game whose first move was illegal
+            self.assertEqual(book.probe(play(KING_WALK[:4])), [])
+            self.assertEqual(book.probe(play([['a2', 'a4']])), [])
+
+    def test_choose_move(self):
+        """
+        Test that the most played legal move is chosen
+        """
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.choose_move(ChessVar()), ('e2', 'e4'))
+            self.assertEqual(book.choose_move(play([['e2', 'e4']])), ('d7', 'd5'))
+            self.assertIsNone(book.choose_move(play([['e2', 'e4']]), min_games=3))
+            self.assertIsNone(book.choose_move(play([['g1', 'f3']])))
+
+    def test_searcher_uses_book(self):
+        """
+        Test that the search plays book moves without searching and searches once out of the book
+        """
+        with OpeningBook(self.book_path) as book:
+            searcher = Searcher(max_depth=2, book=book)
+            self.assertIs(searcher.get_book(), book)
+
+            result = searcher.search(ChessVar())
+            self.assertEqual(result.best_move, ('e2', 'e4'))
+            self.assertEqual((result.depth, result.nodes), (0, 0))
+
+            result = searcher.search(play([['g1', 'f3']]))
+            self.assertEqual(result.depth, 2)
+            self.assertGreater(result.nodes, 0)
+
+            searcher.set_book(None)
+            self.assertEqual(searcher.search(ChessVar()).depth, 2)
+
+    def test_empty_and_invalid_books(self):
+        """
+        Test a book built from no games and a file that is not a book
+        """
+        record_path = os.path.join(self.directory.name, 'none.koth')
+        write_games(record_path, [])
+        self.assertEqual(build_book(self.book_path, record_path), 0)
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.probe(ChessVar()), [])
+            self.assertIsNone(book.choose_move(ChessVar()))
+
+        with self.assertRaises(ValueError):
+            OpeningBook(record_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
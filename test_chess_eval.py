@@ -0,0 +1,90 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_eval.py
+
+import random
+import unittest
+from chess_var import ChessVar
+from chess_search import evaluate
+from chess_eval import np, pack_positions, one_hot_planes, evaluate_batch, evaluate_games, mobility_batch
+
+
+def random_games(count, seed=0):
+    """
+    Returns a list of ChessVar objects, each after a random number of random legal moves.
+    """
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = ChessVar()
+        for _ in range(rng.randrange(60)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.move_made(*rng.choice(moves))
+        games.append(game)
+    return games
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestBatchEvaluation(unittest.TestCase):
+    """
+    Test cases for the NumPy batch evaluation
+    """
+
+    def test_pack_positions(self):
+        """
+        Test the array shapes and contents for a batch of games
+        """
+        game = ChessVar()
+        game.move_made('e2', 'e4')
+        squares, black_to_move = pack_positions([ChessVar(), game])
+
+        self.assertEqual(squares.shape, (2, 64))
+        self.assertEqual(squares.dtype, np.int8)
+        self.assertEqual(bytes(squares[1]), bytes(game._squares))
+        self.assertEqual(list(black_to_move), [False, True])
+
+        planes = one_hot_planes(squares)
+        self.assertEqual(planes.shape, (2, 12, 64))
+        self.assertEqual(planes[0].sum(), 32)
+        self.assertEqual(planes[0, 5, 60], 1)         # white king on e1
+        self.assertEqual(planes[0, 11, 4], 1)         # black king on e8
+
+    def test_matches_evaluate(self):
+        """
+        Test that the batch scores equal chess_search.evaluate position by position
+        """
+        games = random_games(300)
+        self.assertEqual(list(evaluate_games(games)), [evaluate(game) for game in games])
+        self.assertEqual(len(evaluate_games([])), 0)
+
+    def test_mobility(self):
+        """
+        Test that the move counts equal the number of legal moves for the player to move
+        """
+        games = [game for game in random_games(300, seed=1) if game.get_game_state() == 'UNFINISHED']
+        squares, black_to_move = pack_positions(games)
+        white_moves, black_moves = mobility_batch(squares)
+
+        for number, game in enumerate(games):
+            expected = len(game.legal_moves())
+            self.assertEqual(black_moves[number] if black_to_move[number] else white_moves[number], expected)
+
+        self.assertEqual(list(mobility_batch(pack_positions([ChessVar()])[0])[0]), [20])
+
+    def test_mobility_weight(self):
+        """
+        Test that the mobility weight adds the difference in move counts for the player to move
+        """
+        game = ChessVar()
+        game.move_made('e2', 'e4')
+        squares, black_to_move = pack_positions([game])
+        white_moves, black_moves = mobility_batch(squares)
+
+        self.assertEqual(white_moves[0] - black_moves[0], 30 - 20)
+        self.assertEqual(evaluate_batch(squares, black_to_move, mobility_weight=2)[0], evaluate(game) - 2 * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_perft.py
+
+import io
+import unittest
+from unittest import mock
+from chess_var import ChessVar, Bitboards, KNIGHT, GEOMETRY, squares_path_clear
+from chess_perft import PERFT_POSITIONS, reference_moves, reference_path_clear, cross_check, run_suite
+
+
+class TestPerft(unittest.TestCase):
+    """
+    Test cases for the perft counts and cross-check harness
+    """
+
+    def test_reference_counts(self):
+        """
+        Test perft to depth 3 on every test position with both backends
+        """
+        for name, fen, counts in PERFT_POSITIONS:
+            for backend in ('array', 'bitboard'):
+                game = ChessVar.from_fen(fen, backend)
+                for depth in range(1, 4):
+                    self.assertEqual(game.perft(depth), counts[depth - 1], (name, backend, depth))
+
+    def test_reference_moves_match_generator(self):
+        """
+        Test that brute-force reference moves agree with the move generator
+        """
+        for name, fen, counts in PERFT_POSITIONS:
+            game = ChessVar.from_fen(fen)
+            self.assertEqual(reference_moves(game), set(game._generate_moves()), name)
+            self.assertEqual(len(reference_moves(game)), counts[0], name)
+
+    def test_reference_path_clear(self):
+        """
+        Test that the square-by-square reference path check agrees with the BETWEEN table check
+        for every move each piece's geometry allows in the test positions
+        """
+        for name, fen, counts in PERFT_POSITIONS:
+            game = ChessVar.from_fen(fen)
+            squares = game._squares
+            for from_square in range(64):
+                code = squares[from_square]
+                for to_square in range(64):
+                    if code and GEOMETRY[code][from_square] >> to_square & 1:
+                        self.assertEqual(reference_path_clear(squares, from_square, to_square),
+                                         squares_path_clear(squares, game._occupied, from_square, to_square),
+                                         (name, from_square, to_square))
+
+    def test_cross_check(self):
+        """
+        Test that the harness finds no differences for the backends and reports a broken one
+        """
+        fen = PERFT_POSITIONS[3][1]
+        self.assertEqual(cross_check(fen, 1, 'bitboard'), [])
+        self.assertEqual(cross_check(fen, 1, 'array'), [])
+
+        # a bitboard backend that forgets knight moves
+        original = Bitboards.generate_moves
+
+        def without_knights(bitboards, color_bit):
+            knights = bitboards.get_pieces(color_bit | KNIGHT)
+            return [move for move in original(bitboards, color_bit) if not knights >> move[0] & 1]
+
+        with mock.patch.object(Bitboards, 'generate_moves', without_knights):
+            mismatches = cross_check(fen, 1, 'bitboard')
+
+        self.assertGreater(len(mismatches), 1)          # the position and positions after it
+        path, missing, extra = mismatches[0]
+        self.assertEqual(path, [])
+        self.assertIn(('b1', 'c3'), missing)
+        self.assertEqual(extra, [])
+
+    def test_run_suite(self):
+        """
+        Test that the benchmark reports every count as matching
+        """
+        output = io.StringIO()
+        self.assertTrue(run_suite(1, output=output))
+        self.assertEqual(output.getvalue().count(' ok'), 2 * len(PERFT_POSITIONS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_positions.py
+
+import os
+import tempfile
+import unittest
+from chess_var import ChessVar, pack_squares, unpack_squares, START_SQUARES
+from chess_records import write_games
+from chess_positions import PositionStore, PositionStats, build_position_store, MAGIC, HEADER, SLOT
+from test_fixtures import KING_WALK, KING_CAPTURE, play
+
+
+class TestPositionStore(unittest.TestCase):
+    """
+    Test cases for the position store
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory for the files
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'positions.koth')
+
+    def tearDown(self):
+        """
+        Removes the temporary directory
+        """
+        self.directory.cleanup()
+
+    def test_packed_squares(self):
+        """
+        Test that the board packs into 32 bytes and unpacks unchanged
+        """
+        game = play(KING_CAPTURE)
+        self.assertEqual(len(game._packed_squares()), 32)
+        self.assertEqual(unpack_squares(game._packed_squares()), game._squares)
+        self.assertEqual(unpack_squares(pack_squares(START_SQUARES)), START_SQUARES)
+        self.assertEqual(pack_squares(START_SQUARES)[0], 0xAB)     # black rook on a8, black knight on b8
+
+    def test_add_and_lookup(self):
+        """
+        Test that games reaching a position are counted with their results, and that the counts persist
+        """
+        with PositionStore(self.path) as store:
+            self.assertIsNone(store.lookup(ChessVar()))
+            self.assertTrue(store.add(ChessVar(), 'WHITE_WON'))
+            self.assertTrue(store.add(ChessVar(), 'BLACK_WON'))
+            self.assertTrue(store.add(ChessVar(), 'UNFINISHED'))
+            self.assertTrue(store.add(play([['e2', 'e4']]), 'WHITE_WON'))
+            self.assertFalse(store.add(ChessVar(), 'DRAW'))
+            self.assertEqual(store.get_count(), 2)
+
+        with PositionStore(self.path) as store:
+            self.assertEqual(store.get_count(), 2)
+            self.assertEqual(store.lookup(ChessVar()), PositionStats(3, 1, 1))
+            self.assertEqual(store.lookup(play([['e2', 'e4']])), PositionStats(1, 1, 0))
+            self.assertIsNone(store.lookup(play([['d2', 'd4']])))
+
+    def test_side_to_move(self):
+        """
+        Test that the same pieces with a different player to move are a different position
+        """
+        with PositionStore(self.path) as store:
+            store.add(ChessVar.from_fen('4k3/8/8/8/8/8/8/4K3 w'), 'WHITE_WON')
+            self.assertIsNone(store.lookup(ChessVar.from_fen('4k3/8/8/8/8/8/8/4K3 b')))
+            self.assertEqual(store.lookup(ChessVar.from_fen('4k3/8/8/8/8/8/8/4K3 w')).games, 1)
+
+    def test_growth(self):
+        """
+        Test that the table grows as it fills and keeps every position
+        """
+        games = [play(moves) for moves in ([], [['e2', 'e4']], [['d2', 'd4']], [['g1', 'f3']])]
+        games += [ChessVar.from_fen('4k3/8/8/8/8/8/8/%s w' % rank) for rank in ('K7', '1K6', '2K5', '3K4', '4K3')]
+
+        with PositionStore(self.path, capacity=2) as store:
+            self.assertEqual(store.get_capacity(), 4)
+            for number, game in enumerate(games):
+                store.add(game, 'WHITE_WON' if number % 2 else 'BLACK_WON')
+            self.assertEqual(store.get_count(), len(games))
+            self.assertEqual(store.get_capacity(), 16)
+
+            for number, game in enumerate(games):
+                self.assertEqual(store.lookup(game), PositionStats(1, number % 2, 1 - number % 2))
+
+    def test_not_a_position_file(self):
+        """
+        Test that another kind of file is rejected and left alone
+        """
+        with open(self.path, 'wb') as other_file:
+            other_file.write(b'not positions')
+        with self.assertRaises(ValueError):
+            PositionStore(self.path)
+        with open(self.path, 'rb') as other_file:
+            self.assertEqual(other_file.read(), b'not positions')
+
+    def test_bad_slot_count(self):
+        """
+        Test that a header whose slot count is not a nonzero power of two is rejected
+        """
+        for slots in (0, 3, 6):
+            with open(self.path, 'wb') as bad_file:
+                bad_file.write(HEADER.pack(MAGIC, slots, 0) + bytes(slots * SLOT.size))
+            with self.assertRaises(ValueError):
+                PositionStore(self.path)
+
+    def test_build_from_records(self):
+        """
+        Test building the store from a game record file
+        """
+        record_path = os.path.join(self.directory.name, 'games.koth')
+        repeated = [['g1', 'f3'], ['g8', 'f6'], ['f3', 'g1'], ['f6', 'g8'], ['g1', 'f3']]
+        write_games(record_path, [KING_WALK, KING_CAPTURE, repeated])
+
+        self.assertEqual(build_position_store(self.path, record_path), 3)
+        with PositionStore(self.path) as store:
+            self.assertEqual(store.lookup(ChessVar()), PositionStats(3, 1, 1))     # once per game
+            self.assertEqual(store.lookup(play(KING_WALK[:3])), PositionStats(1, 1, 0))
+            self.assertEqual(store.lookup(play(KING_CAPTURE)), PositionStats(1, 0, 1))
+            self.assertEqual(store.lookup(play(repeated)), PositionStats(1, 0, 0))
+            self.assertEqual(store.get_count(), 1 + 7 + 6 + 3)     # the opening position is shared
+
+        limited = os.path.join(self.directory.name, 'opening.koth')
+        build_position_store(limited, record_path, max_plies=1)
+        with PositionStore(limited) as store:
+            self.assertEqual(store.get_count(), 4)
+            self.assertIsNone(store.lookup(play(KING_WALK[:2])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_records.py
+
+import os
+import tempfile
+import unittest
+from chess_replay import replay_games
+from chess_records import (GameWriter, GameArchive, GameRecord, write_games, read_games, build_index, index_path,
+                           encode_move, decode_move, encode_game, index_matches, MAGIC)
+from test_fixtures import KING_WALK, KING_CAPTURE
+
+
+class TestRecordFormat(unittest.TestCase):
+    """
+    Test cases for encoding moves and games
+    """
+
+    def test_moves(self):
+        """
+        Test that moves pack into 12 bits and decode back
+        """
+        self.assertEqual(encode_move('a8', 'a8'), 0)
+        self.assertEqual(encode_move('h1', 'h1'), 4095)
+        self.assertEqual(encode_move('E2', 'E4'), encode_move('e2', 'e4'))
+        self.assertEqual(decode_move(encode_move('e2', 'e4')), ('e2', 'e4'))
+        self.assertIsNone(encode_move('e9', 'e4'))
+        self.assertIsNone(encode_move('e2', ''))
+
+    def test_games(self):
+        """
+        Test the size of a game record and that invalid games are rejected
+        """
+        self.assertEqual(len(encode_game(KING_WALK, 'WHITE_WON')), 3 + 2 * len(KING_WALK))
+        self.assertEqual(len(encode_game([])), 3)
+        self.assertIsNone(encode_game(KING_WALK, 'DRAW'))
+        self.assertIsNone(encode_game([['e2', 'e4'], ['z1', 'e5']]))
+
+
+class TestRecordFiles(unittest.TestCase):
+    """
+    Test cases for writing, streaming and random access
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory for the record files
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.koth')
+
+    def tearDown(self):
+        """
+        Removes the temporary directory
+        """
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        """
+        Test that games written are streamed back in order with their results
+        """
+        games = [KING_WALK, KING_CAPTURE, [['e2', 'e4']], []]
+        self.assertEqual(write_games(self.path, games + [[['e2', 'x9']]]), 4)
+
+        records = list(read_games(self.path))
+        self.assertEqual([record.game_state for record in records],
+                         ['WHITE_WON', 'BLACK_WON', 'UNFINISHED', 'UNFINISHED'])
+        self.assertEqual(records[0], GameRecord('WHITE_WON', [tuple(move) for move in KING_WALK]))
+        self.assertEqual(list(replay_games(record.moves for record in records)), list(replay_games(games)))
+
+    def test_append_and_random_access(self):
+        """
+        Test that games can be added to an existing file and read by number through the index
+        """
+        with GameWriter(self.path) as writer:
+            self.assertEqual(writer.write_game(KING_WALK, 'WHITE_WON'), 0)
+            self.assertIsNone(writer.write_game(KING_WALK, 'DRAW'))
+        with GameWriter(self.path) as writer:
+            self.assertEqual(writer.get_game_count(), 1)
+            for number in range(1, 200):
+                self.assertEqual(writer.write_game(KING_CAPTURE[:number % 7]), number)
+
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game_count(), 200)
+            self.assertEqual(len(archive), 200)
+            self.assertEqual(archive.get_game(0).game_state, 'WHITE_WON')
+            self.assertEqual(archive.get_game(150).moves, [tuple(move) for move in KING_CAPTURE[:150 % 7]])
+            self.assertEqual(archive[199], list(read_games(self.path))[199])
+            self.assertIsNone(archive.get_game(200))
+            self.assertIsNone(archive.get_game(-1))
+            with self.assertRaises(IndexError):
+                archive[200]
+
+    def test_missing_index(self):
+        """
+        Test that a missing index is rebuilt and matches the one written alongside the games
+        """
+        write_games(self.path, [KING_WALK, KING_CAPTURE, []])
+        with open(index_path(self.path), 'rb') as index_file:
+            written = index_file.read()
+
+        os.remove(index_path(self.path))
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game(1).game_state, 'BLACK_WON')
+        with open(index_path(self.path), 'rb') as index_file:
+            self.assertEqual(index_file.read(), written)
+
+    def test_stale_index(self):
+        """
+        Test that an index left from an earlier file at the same path is replaced
+        """
+        write_games(self.path, [KING_WALK, KING_CAPTURE])
+        with open(index_path(self.path), 'rb') as index_file:
+            old_index = index_file.read()
+
+        # a new record file starts a new index
+        os.remove(self.path)
+        with GameWriter(self.path) as writer:
+            self.assertEqual(writer.write_game(KING_CAPTURE, 'BLACK_WON'), 0)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game_count(), 1)
+            self.assertEqual(archive.get_game(0).game_state, 'BLACK_WON')
+
+        # an archive rebuilds an index that does not fit the file
+        with open(index_path(self.path), 'wb') as index_file:
+            index_file.write(old_index)
+        self.assertFalse(index_matches(self.path))
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game_count(), 1)
+            self.assertEqual(archive.get_game(0).moves, [tuple(move) for move in KING_CAPTURE])
+        self.assertTrue(index_matches(self.path))
+
+    def test_append_after_cut_off_game(self):
+        """
+        Test that a game cut off at the end of the file is dropped before new games are added
+        """
+        write_games(self.path, [KING_WALK, KING_CAPTURE])
+        with open(self.path, 'ab') as record_file:
+            record_file.write(encode_game(KING_WALK)[:2])         # part of a game header
+        self.assertTrue(index_matches(self.path))
+
+        with GameWriter(self.path) as writer:
+            self.assertEqual(writer.write_game([['e2', 'e4']]), 2)
+
+        records = list(read_games(self.path))
+        self.assertEqual([len(record.moves) for record in records], [len(KING_WALK), len(KING_CAPTURE), 1])
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game(2), records[2])
+
+    def test_empty_and_damaged_files(self):
+        """
+        Test an archive without games, a file that is not a record file and a file cut off partway through a game
+        """
+        GameWriter(self.path).close()
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.get_game_count(), 0)
+            self.assertIsNone(archive.get_game(0))
+        self.assertEqual(list(read_games(self.path)), [])
+
+        with open(self.path, 'wb') as record_file:
+            record_file.write(b'[["e2", "e4"]]')
+        with self.assertRaises(ValueError):
+            list(read_games(self.path))
+        with self.assertRaises(ValueError):
+            GameWriter(self.path)
+
+        with open(self.path, 'wb') as record_file:
+            record_file.write(MAGIC + encode_game(KING_WALK)[:-1])
+        with self.assertRaises(ValueError):
+            list(read_games(self.path))
+        self.assertEqual(build_index(self.path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
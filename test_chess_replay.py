@@ -0,0 +1,143 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_replay.py
+
+import os
+import tempfile
+import unittest
+from chess_var import ChessVar
+from chess_replay import (replay_games, replay_games_parallel, perft_parallel, pool_map, validate_games,
+                          ReplayResult)
+from test_fixtures import KING_WALK, KING_CAPTURE
+
+
+class TestReplayGames(unittest.TestCase):
+    """
+    Test cases for replay_games
+    """
+
+    def test_results(self):
+        """
+        Test finished, unfinished and illegal games
+        """
+        games = [
+            KING_WALK,
+            KING_CAPTURE,
+            [['e2', 'e4'], ['e7', 'e5']],
+            [['e2', 'e4'], ['e4', 'e5']],           # white moves twice
+            KING_WALK + [['a5', 'a4']],              # move after the game ended
+            [],
+        ]
+        results = list(replay_games(games))
+
+        self.assertEqual(results[0], ReplayResult('WHITE_WON', 'white', None, 7))
+        self.assertEqual(results[1], ReplayResult('BLACK_WON', 'black', None, 6))
+        self.assertEqual(results[2], ReplayResult('UNFINISHED', None, None, 2))
+        self.assertEqual(results[3], ReplayResult('UNFINISHED', None, 1, 1))
+        self.assertEqual(results[4], ReplayResult('WHITE_WON', 'white', 7, 7))
+        self.assertEqual(results[5], ReplayResult('UNFINISHED', None, None, 0))
+
+    def test_streams_lazily(self):
+        """
+        Test that games are consumed one at a time
+        """
+        def games():
+            yield KING_WALK
+            raise AssertionError('read too far')
+
+        self.assertEqual(next(replay_games(games())).winner, 'white')
+
+    def test_bitboard_backend(self):
+        """
+        Test that the bitboard backend gives the same results
+        """
+        games = [KING_WALK, KING_CAPTURE, [['a1', 'a3']]]
+        self.assertEqual(list(replay_games(games, backend='bitboard')), list(replay_games(games)))
+
+    def test_validate_games(self):
+        """
+        Test per-move reasons, stopping at or skipping rejected moves
+        """
+        bad_game = [['e2', 'e4'], ['e4', 'e5'], ['e7', 'e6'], ['d1', 'd2'], ['d1', 'h5'], ['b8', 'b6']]
+        games = [KING_WALK + [['a5', 'a4']], bad_game, []]
+
+        stopped = list(validate_games(games))
+        self.assertEqual(stopped[0], ['OK'] * 7 + ['GAME_OVER'])
+        self.assertEqual(stopped[1], ['OK', 'WRONG_TURN'])
+        self.assertEqual(stopped[2], [])
+
+        continued = list(validate_games(games, stop_on_error=False, backend='bitboard'))
+        self.assertEqual(continued[1], ['OK', 'WRONG_TURN', 'OK', 'OWN_PIECE_CAPTURE', 'OK', 'ILLEGAL_GEOMETRY'])
+        self.assertEqual(continued[0], stopped[0])
+
+        # a game that validates cleanly replays the same way
+        self.assertEqual(next(replay_games([KING_WALK])).moves_played, stopped[0].index('GAME_OVER'))
+
+    def test_reset(self):
+        """
+        Test that reset restores the opening position in place
+        """
+        game = ChessVar()
+        board = game.get_board()
+        for move_from, move_to in KING_WALK:
+            game.move_made(move_from, move_to)
+
+        game.reset()
+        self.assertIs(game.get_board(), board)
+        self.assertEqual(game.get_board(), ChessVar().get_board())
+        self.assertEqual(game.position_hash(), ChessVar().position_hash())
+        self.assertEqual(game.get_game_state(), 'UNFINISHED')
+        self.assertFalse(game.unmake_move())
+
+
+def crash_once(chunk):
+    """
+    Pool function for the tests: receives (marker file, number) items and returns the numbers doubled,
+    but kills its worker process the first time a marker file exists.
+    """
+    results = []
+    for marker, number in chunk:
+        if os.path.exists(marker):
+            os.remove(marker)
+            os._exit(1)
+        results.append(number * 2)
+    return results
+
+
+class TestProcessPool(unittest.TestCase):
+    """
+    Test cases for the multiprocess replay and perft functions
+    """
+
+    def test_parallel_replay_matches_serial(self):
+        """
+        Test that parallel replay gives the serial results, in order and unordered
+        """
+        games = [KING_WALK, KING_CAPTURE, [['e2', 'e4'], ['e4', 'e5']], [['g1', 'f3']]] * 5
+        expected = list(replay_games(games))
+
+        self.assertEqual(list(replay_games_parallel(games, processes=2, chunk_size=3)), expected)
+        unordered = list(replay_games_parallel(games, processes=2, chunk_size=3, ordered=False))
+        self.assertEqual(sorted(unordered, key=repr), sorted(expected, key=repr))
+
+    def test_parallel_perft(self):
+        """
+        Test that perft split across workers matches ChessVar.perft
+        """
+        self.assertEqual(perft_parallel(3, processes=2), ChessVar().perft(3))
+        self.assertEqual(perft_parallel(2, moves=[['e2', 'e4']], processes=2), 601)
+        self.assertIsNone(perft_parallel(2, moves=[['e2', 'e5']], processes=2))
+
+    def test_worker_crash_is_retried(self):
+        """
+        Test that a chunk whose worker died is resubmitted to a new pool
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            marker = os.path.join(directory, 'crash')
+            open(marker, 'w').close()
+            items = [(marker, 1), (marker + '-never', 2), (marker + '-never', 3)]
+            self.assertEqual(list(pool_map(crash_once, items, processes=1, chunk_size=1)), [2, 4, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_search.py
+
+import unittest
+from chess_var import ChessVar
+from chess_search import (Searcher, TranspositionTable, evaluate, WIN_SCORE, HILL_DISTANCE, EXACT, LOWER_BOUND,
+                          UPPER_BOUND)
+from test_fixtures import play
+
+
+class TestSearcher(unittest.TestCase):
+    """
+    Test cases for the Searcher class
+    """
+
+    def test_evaluate_opening(self):
+        """
+        Test that the opening position is balanced
+        """
+        self.assertEqual(evaluate(ChessVar()), 0)
+        self.assertEqual(HILL_DISTANCE[36], 0)     # e4
+        self.assertEqual(HILL_DISTANCE[60], 3)     # e1
+
+    def test_finds_king_on_hill(self):
+        """
+        Test that the search walks the king onto a free central square
+        """
+        game = play([('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2'), ('a7', 'a6'), ('e2', 'e3'), ('a6', 'a5')])
+        result = Searcher(max_depth=3).search(game)
+        self.assertIn(result.best_move, [('e3', 'd4'), ('e4', 'd5')])
+        self.assertEqual(result.best_move, result.principal_variation[0])
+        self.assertGreaterEqual(result.score, WIN_SCORE - 3)
+
+    def test_finds_king_capture(self):
+        """
+        Test that the search captures an exposed king
+        """
+        game = play([('e2', 'e4'), ('f7', 'f6'), ('d1', 'h5'), ('a7', 'a6')])
+        result = Searcher(max_depth=2).search(game)
+        self.assertEqual(result.best_move, ('h5', 'e8'))
+
+    def test_search_leaves_game_unchanged(self):
+        """
+        Test that searching restores the game, including after running out of nodes
+        """
+        game = play([('e2', 'e4'), ('e7', 'e5')])
+        board = [row[:] for row in game.get_board()]
+        position_hash = game.position_hash()
+
+        for searcher in (Searcher(max_depth=3), Searcher(max_depth=10, node_limit=500)):
+            result = searcher.search(game)
+            self.assertIn(result.best_move, game.legal_moves())
+            self.assertEqual(game.get_board(), board)
+            self.assertEqual(game.position_hash(), position_hash)
+            self.assertEqual(game.get_game_state(), 'UNFINISHED')
+
+    def test_no_moves_after_game_over(self):
+        """
+        Test that a finished game has no best move
+        """
+        game = ChessVar()
+        game._game_state = 'BLACK_WON'
+        self.assertIsNone(Searcher().search(game).best_move)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """
+    Test cases for the TranspositionTable class
+    """
+
+    def test_size_from_megabytes(self):
+        """
+        Test that the table size follows the memory setting
+        """
+        self.assertEqual(TranspositionTable(1).get_size(), 65536)     # 16 bytes per entry
+        self.assertEqual(TranspositionTable(0).get_size(), 2)         # one bucket minimum
+
+    def test_store_and_probe(self):
+        """
+        Test that stored entries come back unchanged, including negative scores and missing moves
+        """
+        table = TranspositionTable(1)
+        table.store(12345, 6, -WIN_SCORE + 3, LOWER_BOUND, (52, 36))
+        table.store(99999, 2, 250, UPPER_BOUND, None)
+
+        self.assertEqual(table.probe(12345), (6, -WIN_SCORE + 3, LOWER_BOUND, (52, 36)))
+        self.assertEqual(table.probe(99999), (2, 250, UPPER_BOUND, None))
+        self.assertIsNone(table.probe(424242))
+        self.assertEqual(table.get_stats(), {'hits': 2, 'misses': 1, 'collisions': 0})
+
+    def test_replacement_policy(self):
+        """
+        Test that the deepest entry in a bucket is kept and the second slot is always replaced
+        """
+        table = TranspositionTable(0)      # a single bucket
+        table.store(1, 8, 10, EXACT, None)
+        table.store(2, 3, 20, EXACT, None)
+        table.store(3, 4, 30, EXACT, None)
+
+        self.assertEqual(table.probe(1)[0], 8)     # deep entry survives
+        self.assertIsNone(table.probe(2))          # replaced by the next shallower entry
+        self.assertEqual(table.probe(3)[1], 30)
+        self.assertIsNone(table.probe(4))
+        self.assertEqual(table.get_stats()['collisions'], 2)
+
+        table.store(4, 9, 40, EXACT, None)         # deeper entry takes the first slot
+        self.assertIsNone(table.probe(1))
+
+        table.clear()
+        self.assertIsNone(table.probe(4))
+        self.assertEqual(table.get_stats(), {'hits': 0, 'misses': 1, 'collisions': 0})
+
+    def test_search_uses_table(self):
+        """
+        Test that a search fills the table and gets the same answer with it
+        """
+        game = play([('e2', 'e4'), ('e7', 'e5'), ('g1', 'f3')])
+        searcher = Searcher(max_depth=4, table_mb=1)
+        result = searcher.search(game)
+        self.assertGreater(searcher.get_table().get_stats()['hits'], 0)
+        self.assertEqual(result.score, Searcher(max_depth=4, table_mb=0).search(game).score)
+
+
+if __name__ == '__main__':
+    unittest.main()
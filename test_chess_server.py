@@ -0,0 +1,278 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains unit tests for chess_server.py
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from chess_var import ChessVar
+from chess_server import SessionRegistry, GameServer
+
+
+async def request(reader, writer, message):
+    """
+    Sends one request over an open connection and returns the decoded response.
+    """
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+class TestSessionRegistry(unittest.TestCase):
+    """
+    Test cases for the registry of games
+    """
+
+    def test_games(self):
+        """
+        Test creating, using and closing games
+        """
+        registry = SessionRegistry(max_games=2)
+        first = registry.new_game()
+        second = registry.new_game()
+        self.assertNotEqual(first, second)
+        self.assertIsNone(registry.new_game())
+        self.assertEqual(registry.get_count(), 2)
+
+        # new games are parked until used
+        self.assertEqual(registry.get_live_count(), 0)
+        self.assertTrue(registry.get_game(first).move_made('e2', 'e4'))
+        self.assertEqual(registry.get_live_count(), 1)
+        self.assertIs(registry.get_game(first), registry.get_game(first))
+
+        self.assertTrue(registry.close_game(second))
+        self.assertFalse(registry.close_game(second))
+        self.assertIsNone(registry.get_game(second))
+        self.assertIsNotNone(registry.new_game())
+
+    def test_park_and_remove_idle(self):
+        """
+        Test that idle games are parked, rebuilt unchanged when used, and removed after the idle timeout
+        """
+        registry = SessionRegistry(park_after=10, idle_timeout=100)
+        game_id = registry.new_game()
+        game = registry.get_game(game_id)
+        for move_from, move_to in [('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2')]:
+            game.move_made(move_from, move_to)
+        board = [row[:] for row in game.get_board()]
+
+        now = time.monotonic()
+        self.assertEqual(registry.park_idle(now + 5), (0, 0))
+        self.assertEqual(registry.park_idle(now + 50), (1, 0))
+        self.assertEqual(registry.get_live_count(), 0)
+
+        rebuilt = registry.get_game(game_id)
+        self.assertIsNot(rebuilt, game)
+        self.assertEqual(rebuilt.get_board(), board)
+        self.assertEqual(rebuilt.get_game_state(), 'UNFINISHED')
+        self.assertFalse(rebuilt.move_made('e2', 'e3'))          # still black to move
+        self.assertTrue(rebuilt.move_made('a7', 'a6'))
+
+        other = registry.new_game()
+        self.assertEqual(registry.park_idle(time.monotonic() + 500, limit=1), (0, 1))
+        self.assertEqual(registry.park_idle(time.monotonic() + 500), (0, 1))
+        self.assertEqual(registry.get_count(), 0)
+        self.assertIsNone(registry.get_game(other))
+
+    def test_many_idle_games(self):
+        """
+        Test that a large number of idle games stays cheap to hold and to sweep
+        """
+        registry = SessionRegistry(park_after=10)
+        for _ in range(20000):
+            registry.new_game()
+        self.assertEqual(registry.get_count(), 20000)
+        self.assertEqual(registry.get_live_count(), 0)
+        self.assertEqual(registry.park_idle(time.monotonic() + 60), (0, 0))
+
+        # live games among them are parked a batch at a time, without walking the parked games
+        for game_id in list(registry._sessions)[:300]:
+            registry.get_game(game_id)
+        self.assertEqual(registry.get_live_count(), 300)
+        now = time.monotonic() + 60
+        self.assertEqual(registry.park_idle(now, limit=256), (256, 0))
+        self.assertEqual(registry.park_idle(now, limit=256), (44, 0))
+        self.assertEqual(registry.park_idle(now, limit=256), (0, 0))
+        self.assertEqual(registry.get_live_count(), 0)
+
+    def test_save_and_load(self):
+        """
+        Test that saved games, live and parked, load back parked with the same positions
+        """
+        registry = SessionRegistry()
+        played = registry.new_game()
+        untouched = registry.new_game()
+        for move_from, move_to in [('e2', 'e4'), ('d7', 'd5')]:
+            registry.get_game(played).move_made(move_from, move_to)
+        fen = registry.get_game(played).to_fen()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sessions.bin')
+            self.assertEqual(registry.save(path), 2)
+            self.assertEqual(os.path.getsize(path), 8 + 2 * (8 + 34))
+
+            loaded = SessionRegistry()
+            self.assertEqual(loaded.load(path), 2)
+            self.assertEqual(loaded.get_live_count(), 0)
+            self.assertEqual(loaded.get_game(played).to_fen(), fen)
+            self.assertEqual(loaded.get_game(untouched).to_fen(), ChessVar().to_fen())
+
+            with open(path, 'ab') as session_file:
+                session_file.write(b'extra')
+            with self.assertRaises(ValueError):
+                SessionRegistry().load(path)
+
+    def test_parked_games_are_small(self):
+        """
+        Test that a parked game keeps only its 34-byte snapshot
+        """
+        registry = SessionRegistry(park_after=1)
+        game_id = registry.new_game()
+        registry.get_game(game_id).move_made('g1', 'f3')
+        registry.park_idle(time.monotonic() + 10)
+        self.assertEqual(len(registry._sessions[game_id].parked), 34)
+        self.assertIsNone(registry._sessions[game_id].game)
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Test cases for the JSON line protocol over sockets
+    """
+
+    async def asyncSetUp(self):
+        """
+        Starts a server on a free TCP port
+        """
+        self.server = GameServer(max_line=256, max_connections=3)
+        await self.server.start()
+        self.host, self.port = self.server.get_address()[:2]
+
+    async def asyncTearDown(self):
+        """
+        Stops the server
+        """
+        await self.server.close()
+
+    async def test_play_over_tcp(self):
+        """
+        Test a game played through the protocol
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        created = await request(reader, writer, {'op': 'new_game', 'id': 1})
+        self.assertTrue(created['ok'])
+        self.assertEqual(created['id'], 1)
+        game = created['game']
+
+        response = await request(reader, writer, {'op': 'move_made', 'game': game, 'from': 'e2', 'to': 'e4'})
+        self.assertEqual(response, {'ok': True, 'result': True, 'reason': 'OK', 'game_state': 'UNFINISHED'})
+        response = await request(reader, writer, {'op': 'move_made', 'game': game, 'from': 'e4', 'to': 'e5'})
+        self.assertEqual((response['result'], response['reason']), (False, 'WRONG_TURN'))
+
+        expected = ChessVar()
+        expected.move_made('e2', 'e4')
+        response = await request(reader, writer, {'op': 'get_board', 'game': game})
+        self.assertEqual(response['result'], expected.get_board())
+        response = await request(reader, writer, {'op': 'get_game_state', 'game': game})
+        self.assertEqual(response['result'], 'UNFINISHED')
+
+        response = await request(reader, writer, {'op': 'close_game', 'game': game})
+        self.assertEqual(response, {'ok': True, 'result': True})
+        response = await request(reader, writer, {'op': 'get_game_state', 'game': game})
+        self.assertEqual(response, {'ok': False, 'error': 'UNKNOWN_GAME'})
+
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_bad_requests(self):
+        """
+        Test the errors for malformed, unknown and oversized requests
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        writer.write(b'not json\n')
+        self.assertEqual(json.loads(await reader.readline())['error'], 'BAD_REQUEST')
+        self.assertEqual((await request(reader, writer, [1, 2]))['error'], 'BAD_REQUEST')
+        self.assertEqual((await request(reader, writer, {'op': 'unmake_move'}))['error'], 'UNKNOWN_OP')
+        self.assertEqual((await request(reader, writer, {'op': 'get_board'}))['error'], 'BAD_REQUEST')
+
+        game = (await request(reader, writer, {'op': 'new_game'}))['game']
+        response = await request(reader, writer, {'op': 'move_made', 'game': game, 'from': 'e2'})
+        self.assertEqual(response['error'], 'BAD_REQUEST')
+
+        # an oversized line ends the connection
+        writer.write(b'{"op": "' + b'x' * 1000 + b'"}\n')
+        self.assertEqual(json.loads(await reader.readline())['error'], 'LINE_TOO_LONG')
+        self.assertEqual(await reader.readline(), b'')
+        writer.close()
+
+    async def test_concurrent_clients(self):
+        """
+        Test clients playing separate games at the same time, pipelined requests and the connection limit
+        """
+        connections = [await asyncio.open_connection(self.host, self.port) for _ in range(3)]
+
+        async def play(reader, writer):
+            game = (await request(reader, writer, {'op': 'new_game'}))['game']
+            moves = [('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2'), ('a7', 'a6'), ('e2', 'e3'), ('a6', 'a5'), ('e3', 'd4')]
+
+            # send every move before reading any response; they are answered in order
+            for move_from, move_to in moves:
+                writer.write(json.dumps({'op': 'move_made', 'game': game, 'from': move_from, 'to': move_to}).encode()
+                             + b'\n')
+            responses = [json.loads(await reader.readline()) for _ in moves]
+            return [response['result'] for response in responses], responses[-1]['game_state']
+
+        results = await asyncio.gather(*(play(reader, writer) for reader, writer in connections))
+        self.assertEqual(results, [([True] * 7, 'WHITE_WON')] * 3)
+
+        # a fourth client is turned away while three are connected
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.assertEqual(json.loads(await reader.readline())['error'], 'SERVER_BUSY')
+        writer.close()
+
+        for reader, writer in connections:
+            writer.close()
+            await writer.wait_closed()
+
+    async def test_per_game_lock(self):
+        """
+        Test that requests for one game wait for each other while another game is served meanwhile
+        """
+        registry = self.server.get_registry()
+        first = registry.new_game()
+        second = registry.new_game()
+
+        async with registry.locked(first):
+            waiting = asyncio.ensure_future(self.server.handle({'op': 'get_game_state', 'game': first}))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiting.done())
+            self.assertTrue((await self.server.handle({'op': 'get_game_state', 'game': second}))['ok'])
+
+        self.assertEqual((await waiting)['result'], 'UNFINISHED')
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'Unix sockets are not available')
+    async def test_unix_socket(self):
+        """
+        Test the protocol over a Unix socket
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'chess.sock')
+            server = GameServer()
+            await server.start(path=path)
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                game = (await request(reader, writer, {'op': 'new_game'}))['game']
+                response = await request(reader, writer, {'op': 'move_made', 'game': game, 'from': 'g1', 'to': 'f3'})
+                self.assertTrue(response['result'])
+                writer.close()
+                await writer.wait_closed()
+            finally:
+                await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,12 @@
 # Date: 03/16/2025 (uploaded to GitHub: 07/27/2025)
 # Description: This program contains unit tests for chess_var.py
 
+import copy
+import pickle
 import unittest
-from chess_var import ChessVar, Pawn, Rook, Knight, Bishop, Queen, King
+from chess_var import (ChessVar, Pawn, Rook, Knight, Bishop, Queen, King, Bitboards, START_SQUARES, WHITE, BLACK,
+                       zobrist_hash, BETWEEN, SQUARE_NAMES, SQUARE_NUMBERS, mask_squares, KNIGHT, WHITE_KING, BLACK_ROOK,
+                       PIECES, GEOMETRY, Position)
 
 
 class TestChessPieces(unittest.TestCase):
@@ -44,6 +48,39 @@ class TestChessPieces(unittest.TestCase):
         self.assertEqual(self.white_king.get_letter(), 'k')
 
 
+    def test_pieces_are_immutable_flyweights(self):
+        """
+        Test precomputed attributes, immutability and sharing of piece objects
+        """
+        self.assertEqual(self.white_queen.get_abbreviation(), 'Q')
+        self.assertEqual(self.black_queen.get_abbreviation(), 'q')
+        self.assertEqual(self.black_knight.code, BLACK | KNIGHT)
+        self.assertEqual(self.white_knight.piece_type, KNIGHT)
+        self.assertEqual(self.white_knight.color_bit, WHITE)
+        self.assertFalse(hasattr(self.white_pawn, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            self.white_pawn._color = 'black'
+        with self.assertRaises(AttributeError):
+            self.white_pawn.extra = 1
+
+        self.assertIs(copy.deepcopy(WHITE_KING), WHITE_KING)
+        self.assertIs(pickle.loads(pickle.dumps(BLACK_ROOK)), BLACK_ROOK)
+        self.assertIs(ChessVar().get_dictionary()['e1'], ChessVar().get_dictionary()['e1'])
+
+    def test_geometry_table_matches_legal_move(self):
+        """
+        Test that the move geometry table agrees with every piece's legal_move method
+        """
+        for piece in PIECES:
+            if piece is None:
+                continue
+            for from_square in range(64):
+                for to_square in range(64):
+                    expected = to_square != from_square and piece.legal_move(
+                        (from_square >> 3, from_square & 7), (to_square >> 3, to_square & 7))
+                    self.assertEqual(GEOMETRY[piece.code][from_square] >> to_square & 1 == 1, expected)
+
     def test_pawn_legal_moves(self):
         """
         Test pawn movement rules
@@ -376,6 +413,604 @@ class TestChessVar(unittest.TestCase):
         self.assertTrue(self.game.move_made('f1', 'c4'))
         self.assertTrue(self.game.move_made('f8', 'c5'))
 
+    def test_incremental_board_update(self):
+        """
+        Test that the incrementally updated board matches a full rebuild
+        """
+        self.game.set_debug(True)
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('e4', 'd5'), ('d8', 'd5'), ('b1', 'c3')]:
+            self.assertTrue(self.game.move_made(move[0], move[1]))
+            self.assertTrue(self.game.board_consistent())
+
+        # a stale cell is detected
+        self.game.get_board()[3][3] = ' '
+        self.assertFalse(self.game.board_consistent())
+        self.game.set_board()
+        self.assertTrue(self.game.board_consistent())
+
+    def test_board_views_follow_moves(self):
+        """
+        Test that the dictionary and board views stay current after being requested
+        """
+        dictionary = self.game.get_dictionary()
+        board = self.game.get_board()
+        self.assertIsInstance(dictionary['e2'], Pawn)
+        self.assertEqual(dictionary['e2'].get_color(), 'white')
+        self.assertIsNone(dictionary['e4'])
+
+        self.assertTrue(self.game.move_made('e2', 'e4'))
+
+        # the same objects are updated in place
+        self.assertIsNone(dictionary['e2'])
+        self.assertIsInstance(dictionary['e4'], Pawn)
+        self.assertEqual(board[4][4], 'P')
+        self.assertIs(self.game.get_dictionary(), dictionary)
+        self.assertIs(self.game.get_board(), board)
+
+    def test_dictionary_is_read_only(self):
+        """
+        Test that the dictionary view cannot be edited, and set_dictionary moves the piece instead
+        """
+        dictionary = self.game.get_dictionary()
+        with self.assertRaises(TypeError):
+            dictionary['e4'] = dictionary['e2']
+        with self.assertRaises(TypeError):
+            del dictionary['e2']
+
+        self.game.set_dictionary('e2', 'e4')
+        self.game.set_board()
+        self.assertIsInstance(dictionary['e4'], Pawn)
+        self.assertIsNone(dictionary['e2'])
+        self.assertTrue(self.game.move_made('e4', 'e5'))
+
+        # copies get a view of their own squares
+        for clone in (copy.deepcopy(self.game), pickle.loads(pickle.dumps(self.game))):
+            self.assertTrue(clone.move_made('e7', 'e6'))
+            self.assertIsInstance(clone.get_dictionary()['e6'], Pawn)
+            self.assertIsNone(dictionary['e6'])
+
+    def test_legal_moves_opening(self):
+        """
+        Test the moves generated for the opening position
+        """
+        moves = self.game.legal_moves()
+        self.assertEqual(len(moves), 20)
+        self.assertIn(('e2', 'e4'), moves)
+        self.assertIn(('g1', 'f3'), moves)
+        self.assertNotIn(('a1', 'a3'), moves)
+        self.assertEqual(sorted(self.game.legal_moves_from('b1')), [('b1', 'a3'), ('b1', 'c3')])
+        self.assertEqual(self.game.legal_moves_from('e7'), [])     # not black's turn
+        self.assertEqual(self.game.legal_moves_from('z9'), [])
+
+    def test_legal_moves_match_move_made(self):
+        """
+        Test that every generated move is accepted by move_made and no other move is
+        """
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('d1', 'g4'), ('c8', 'g4')]:
+            self.game.move_made(move[0], move[1])
+
+        moves = set(self.game.legal_moves())
+        squares = [letter + number for letter in 'abcdefgh' for number in '12345678']
+        for move_from in squares:
+            for move_to in squares:
+                trial = ChessVar()
+                for move in [('e2', 'e4'), ('d7', 'd5'), ('d1', 'g4'), ('c8', 'g4')]:
+                    trial.move_made(move[0], move[1])
+                self.assertEqual(trial.move_made(move_from, move_to), (move_from, move_to) in moves)
+
+    def test_no_legal_moves_after_game_over(self):
+        """
+        Test that no moves are generated once the game has ended
+        """
+        self.game._game_state = 'WHITE_WON'
+        self.assertEqual(self.game.legal_moves(), [])
+
+    def test_make_and_unmake_move(self):
+        """
+        Test that unmake_move restores captured pieces, turn and game state
+        """
+        self.assertFalse(self.game.unmake_move())      # nothing to take back
+        board = [row[:] for row in self.game.get_board()]
+
+        self.assertTrue(self.game.make_move('e2', 'e4'))
+        self.assertTrue(self.game.make_move('d7', 'd5'))
+        self.assertTrue(self.game.make_move('e4', 'd5'))
+        self.assertEqual(self.game.get_board()[3][3], 'P')
+
+        self.assertTrue(self.game.unmake_move())
+        self.assertEqual(self.game.get_board()[3][3], 'p')     # captured pawn restored
+        self.assertEqual(self.game._current_color, 'white')
+        self.assertTrue(self.game.unmake_move())
+        self.assertTrue(self.game.unmake_move())
+        self.assertEqual(self.game.get_board(), board)
+        self.assertFalse(self.game.unmake_move())
+
+        # move_made keeps no history, and forgets moves remembered before it
+        self.assertTrue(self.game.make_move('e2', 'e4'))
+        self.assertTrue(self.game.move_made('e7', 'e5'))
+        self.assertEqual(self.game._undo_stack, [])
+        self.assertFalse(self.game.unmake_move())
+
+    def test_unmake_winning_move(self):
+        """
+        Test that taking back a winning move reopens the game
+        """
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2'), ('d5', 'e4'), ('e2', 'e3'), ('a7', 'a6')]:
+            self.assertTrue(self.game.move_made(move[0], move[1]))
+
+        self.assertTrue(self.game.make_move('e3', 'd4'))       # king reaches the hill
+        self.assertEqual(self.game.get_game_state(), 'WHITE_WON')
+        self.assertTrue(self.game.unmake_move())
+        self.assertEqual(self.game.get_game_state(), 'UNFINISHED')
+        self.assertTrue(self.game.move_made('e3', 'e4'))       # captures the pawn on the hill
+        self.assertEqual(self.game.get_game_state(), 'WHITE_WON')
+
+    def test_position_hash(self):
+        """
+        Test that transposed move orders give the same hash and that the player to move matters
+        """
+        other = ChessVar()
+        self.assertEqual(self.game.position_hash(), other.position_hash())
+
+        for move in [('g1', 'f3'), ('g8', 'f6'), ('b1', 'c3'), ('b8', 'c6')]:
+            self.game.move_made(move[0], move[1])
+        for move in [('b1', 'c3'), ('b8', 'c6'), ('g1', 'f3'), ('g8', 'f6')]:
+            other.move_made(move[0], move[1])
+        self.assertEqual(self.game.position_hash(), other.position_hash())
+
+        # same pieces, different player to move
+        start_hash = ChessVar().position_hash()
+        self.game.move_made('f3', 'g1')
+        self.game.move_made('f6', 'g8')
+        self.game.move_made('c3', 'b1')
+        self.assertNotEqual(self.game.position_hash(), start_hash)
+        self.game.make_move('c6', 'b8')
+        self.assertEqual(self.game.position_hash(), start_hash)
+
+        self.game.unmake_move()
+        self.assertEqual(self.game.position_hash(), zobrist_hash(self.game._squares, 'black'))
+
+    def test_perft_opening(self):
+        """
+        Test move sequence counts from the opening position
+        """
+        self.assertEqual(self.game.perft(0), 1)
+        self.assertEqual(self.game.perft(1), 20)
+        self.assertEqual(self.game.perft(2), 400)
+        self.assertEqual(self.game.perft(3), 8910)
+        self.assertEqual(self.game.get_board(), ChessVar().get_board())
+
+    def test_between_table(self):
+        """
+        Test the precomputed squares between two squares
+        """
+        def between(move_from, move_to):
+            mask = BETWEEN[SQUARE_NUMBERS[move_from] * 64 + SQUARE_NUMBERS[move_to]]
+            return sorted(SQUARE_NAMES[square] for square in mask_squares(mask))
+
+        self.assertEqual(between('a1', 'a4'), ['a2', 'a3'])
+        self.assertEqual(between('h8', 'e5'), ['f6', 'g7'])
+        self.assertEqual(between('c1', 'f1'), ['d1', 'e1'])
+        self.assertEqual(between('e4', 'e5'), [])
+        self.assertEqual(between('b1', 'c3'), [])     # not on a line
+
+    def test_path_clear(self):
+        """
+        Test path checks for sliding pieces and pawns
+        """
+        self.assertFalse(self.game.path_clear((7, 0), (5, 0)))     # rook behind pawn
+        self.assertTrue(self.game.path_clear((7, 1), (5, 2)))      # knight jumps
+        self.assertTrue(self.game.path_clear((6, 4), (4, 4)))      # pawn two spaces
+        self.assertFalse(self.game.path_clear((6, 4), (5, 5)))     # pawn diagonal without capture
+        self.game.move_made('e2', 'e4')
+        self.game.move_made('e7', 'e5')
+        self.assertFalse(self.game.path_clear((4, 4), (2, 4)))     # pawn two spaces into a piece
+        self.assertTrue(self.game.path_clear((7, 5), (3, 1)))      # bishop f1 to b5
+
+    def test_coordinate_conversion_cases(self):
+        """
+        Test uppercase coordinates and extra characters in conversion and moves
+        """
+        self.assertEqual(self.game.string_to_index('E4'), (4, 4))
+        self.assertEqual(self.game.string_to_index('a1x'), (7, 0))
+        self.assertIsNone(self.game.string_to_index('a9'))
+        self.assertIsNone(self.game.string_to_index('i1'))
+        self.assertIsNone(self.game.index_to_string((0, 8)))
+        self.assertIsNone(self.game.index_to_string((-1, 0)))
+
+        self.assertTrue(self.game.move_made('E2', 'E4'))
+        self.assertEqual(self.game.legal_moves_from('B8'), self.game.legal_moves_from('b8'))
+        self.assertFalse(self.game.move_made('e7', 'E7'))
+        self.assertFalse(self.game.move_made('e7x', 'e5'))
+
+    def test_piece_tracking(self):
+        """
+        Test that king squares and piece lists follow moves, captures and take-backs
+        """
+        self.assertEqual(self.game.get_king_square('white'), 'e1')
+        self.assertEqual(len(self.game.get_piece_squares('black')), 16)
+
+        for move in [('f2', 'f3'), ('e7', 'e5'), ('e1', 'f2'), ('d8', 'h4'), ('a2', 'a3')]:
+            self.assertTrue(self.game.move_made(move[0], move[1]))
+        self.assertEqual(self.game.get_king_square('white'), 'f2')
+        self.assertFalse(self.game.king_captured())
+
+        self.assertTrue(self.game.make_move('h4', 'f2'))       # queen takes king
+        self.assertEqual(self.game.get_game_state(), 'BLACK_WON')
+        self.assertIsNone(self.game.get_king_square('white'))
+        self.assertNotIn('f2', self.game.get_piece_squares('white'))
+        self.assertIn('f2', self.game.get_piece_squares('black'))
+
+        self.game.unmake_move()
+        self.assertEqual(self.game.get_king_square('white'), 'f2')
+        self.assertEqual(len(self.game.get_piece_squares('white')), 16)
+
+    def test_fen_round_trip(self):
+        """
+        Test that to_fen and from_fen reproduce the position, side to move and game state
+        """
+        self.assertEqual(self.game.to_fen(), 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w UNFINISHED')
+
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('g1', 'f3')]:
+            self.assertTrue(self.game.move_made(move[0], move[1]))
+        fen = self.game.to_fen()
+        self.assertEqual(fen, 'rnbqkbnr/ppp1pppp/8/3p4/4P3/5N2/PPPP1PPP/RNBQKB1R b UNFINISHED')
+
+        for backend in ('array', 'bitboard'):
+            copy_game = ChessVar.from_fen(fen, backend)
+            self.assertEqual(copy_game.get_backend(), backend)
+            self.assertEqual(copy_game.to_fen(), fen)
+            self.assertEqual(copy_game.get_board(), self.game.get_board())
+            self.assertEqual(copy_game.position_hash(), self.game.position_hash())
+            self.assertEqual(copy_game.legal_moves(), self.game.legal_moves())
+            self.assertTrue(copy_game.board_consistent())
+
+        # a finished game stays finished
+        won = ChessVar.from_fen('8/8/8/3K4/8/8/8/k7 b WHITE_WON')
+        self.assertEqual(won.get_game_state(), 'WHITE_WON')
+        self.assertFalse(won.move_made('a1', 'a2'))
+
+    def test_fen_fields(self):
+        """
+        Test the optional fields of from_fen and that standard FEN fields the variant lacks are ignored
+        """
+        game = ChessVar.from_fen('4k3/8/8/8/8/8/8/4K3')
+        self.assertEqual(game.to_fen(), '4k3/8/8/8/8/8/8/4K3 w UNFINISHED')
+        self.assertEqual(game.get_king_square('black'), 'e8')
+
+        game = ChessVar.from_fen('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1')
+        self.assertEqual(game.to_fen(), 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b UNFINISHED')
+        self.assertTrue(game.move_made('e7', 'e5'))
+
+        # positions without a king are allowed, as after a capture
+        self.assertIsNotNone(ChessVar.from_fen('8/8/8/8/8/8/8/8 w'))
+
+    def test_invalid_fen(self):
+        """
+        Test that malformed position strings and positions with two kings of a color return None
+        """
+        for fen in ['', '   ', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP',      # too few ranks
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR/8',        # too many ranks
+                    'rnbqkbn/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNRR',          # squares in the wrong ranks
+                    'rnbqkbnr/pppppppp/9/7/8/8/PPPPPPPP/RNBQKBNR',          # 9 is not a digit run
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX',          # unknown piece letter
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x',        # unknown color
+                    '4k3/8/8/8/8/8/8/3KK3 w']:                              # two white kings
+            self.assertIsNone(ChessVar.from_fen(fen), fen)
+
+    def test_check_move_reasons(self):
+        """
+        Test the reason given for each kind of rejected move, with both backends
+        """
+        for backend in ('array', 'bitboard'):
+            game = ChessVar(backend=backend)
+            self.assertEqual(game.check_move('e2', 'e4'), 'OK')
+            self.assertEqual(game.check_move('e2', 'e9'), 'INVALID_SQUARE')
+            self.assertEqual(game.check_move('x2', 'e4'), 'INVALID_SQUARE')
+            self.assertEqual(game.check_move('e2', 'E2'), 'NO_MOVE')
+            self.assertEqual(game.check_move('e4', 'e5'), 'EMPTY_SQUARE')
+            self.assertEqual(game.check_move('e7', 'e5'), 'WRONG_TURN')
+            self.assertEqual(game.check_move('d1', 'e2'), 'OWN_PIECE_CAPTURE')
+            self.assertEqual(game.check_move('g1', 'g3'), 'ILLEGAL_GEOMETRY')
+            self.assertEqual(game.check_move('a1', 'a3'), 'BLOCKED_PATH')
+            self.assertEqual(game.check_move('e2', 'd3'), 'BLOCKED_PATH')       # pawn diagonal without capture
+            self.assertEqual(game.get_board(), ChessVar().get_board())           # nothing was moved
+
+            for move_from, move_to in [('f2', 'f3'), ('e7', 'e5'), ('e1', 'f2'), ('d8', 'h4'), ('a2', 'a3'),
+                                       ('h4', 'f2')]:
+                self.assertEqual(game.check_move(move_from, move_to), 'OK')
+                game.move_made(move_from, move_to)
+            self.assertEqual(game.check_move('a3', 'a4'), 'GAME_OVER')
+
+    def test_attempt_move(self):
+        """
+        Test that attempt_move makes legal moves like move_made and reports why others are rejected
+        """
+        self.assertEqual(self.game.attempt_move('a1', 'a3'), 'BLOCKED_PATH')
+        self.assertEqual(self.game.attempt_move('e2', 'e4'), 'OK')
+        self.assertEqual(self.game.get_board()[4][4], 'P')
+        self.assertEqual(self.game.attempt_move('e4', 'e5'), 'WRONG_TURN')
+        self.assertFalse(self.game.unmake_move())                # kept no move history, as move_made
+
+        for move_from, move_to in [('d7', 'd5'), ('e1', 'e2'), ('a7', 'a6'), ('e2', 'e3'), ('a6', 'a5')]:
+            self.assertEqual(self.game.attempt_move(move_from, move_to), 'OK')
+        self.assertEqual(self.game.attempt_move('e3', 'd4'), 'OK')           # king reaches the hill
+        self.assertEqual(self.game.get_game_state(), 'WHITE_WON')
+        self.assertEqual(self.game.attempt_move('a5', 'a4'), 'GAME_OVER')
+
+    def test_snapshot_and_restore(self):
+        """
+        Test that a snapshot is 34 bytes and restores the position, player to move and game state
+        """
+        self.assertEqual(self.game.snapshot(), ChessVar().snapshot())
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2')]:
+            self.assertTrue(self.game.move_made(move[0], move[1]))
+
+        blob = self.game.snapshot()
+        self.assertIsInstance(blob, bytes)
+        self.assertEqual(len(blob), 34)
+        self.assertEqual(blob[32:], b'\x01\x00')                # black to move, UNFINISHED
+
+        for backend in ('array', 'bitboard'):
+            restored = ChessVar.restore(blob, backend)
+            self.assertEqual(restored.get_backend(), backend)
+            self.assertEqual(restored.to_fen(), self.game.to_fen())
+            self.assertEqual(restored.position_hash(), self.game.position_hash())
+            self.assertEqual(restored.legal_moves(), self.game.legal_moves())
+            self.assertTrue(restored.board_consistent())
+
+        won = ChessVar.from_fen('8/8/8/3K4/8/8/8/k7 b WHITE_WON')
+        self.assertEqual(ChessVar.restore(won.snapshot()).get_game_state(), 'WHITE_WON')
+
+    def test_restore_invalid(self):
+        """
+        Test that restore returns None for bytes that are not a valid snapshot
+        """
+        blob = self.game.snapshot()
+        for bad in [b'', blob[:33], blob + b'\x00', blob[:32] + b'\x02\x00', blob[:32] + b'\x00\x03',
+                    b'\x77' + blob[1:],                                   # code 7 is not a piece
+                    blob[:30] + b'\x66' + blob[31:],                      # three white kings
+                    blob.hex()]:
+            self.assertIsNone(ChessVar.restore(bad), bad)
+
+    def test_set_dictionary_then_move(self):
+        """
+        Test that moving pieces with set_dictionary keeps the position consistent for move_made
+        """
+        self.game.set_dictionary('e2', 'e4')
+        self.game.set_board()
+        self.game.set_dictionary('e1', 'e3')
+        self.game.set_board()
+        self.assertTrue(self.game.board_consistent())
+        self.assertEqual(self.game.get_king_square('white'), 'e3')
+        self.assertTrue(self.game.move_made('e3', 'd4'))       # king reaches the hill
+        self.assertEqual(self.game.get_game_state(), 'WHITE_WON')
+
+    def test_set_dictionary_path_clear(self):
+        """
+        Test that path checks see pieces moved with set_dictionary
+        """
+        self.game.set_dictionary('a2', 'a5')
+        self.assertTrue(self.game.path_clear((7, 0), (4, 0)))       # a1 to a4
+        self.assertFalse(self.game.path_clear((7, 0), (2, 0)))      # a1 to a6, past the pawn on a5
+        self.assertTrue(self.game.move_made('a1', 'a4'))
+
+    def test_set_dictionary_updates_hash(self):
+        """
+        Test that the position hash follows pieces moved with set_dictionary, including in debug mode
+        """
+        self.game.set_debug(True)
+        self.game.set_dictionary('b1', 'c3')
+        self.assertEqual(self.game.position_hash(), zobrist_hash(self.game._squares, 'white'))
+        self.assertTrue(self.game.move_made('c3', 'd5'))               # checked against the squares after the move
+        self.assertEqual(self.game.position_hash(), zobrist_hash(self.game._squares, 'black'))
+
+
+class TestPosition(unittest.TestCase):
+    """
+    Test cases for the immutable Position value type
+    """
+
+    def test_opening_position(self):
+        """
+        Test that a new Position is the opening position with white to move and matches a new ChessVar
+        """
+        position = Position()
+        game = ChessVar()
+        self.assertEqual(position.get_squares(), START_SQUARES)
+        self.assertEqual(position.get_current_color(), 'white')
+        self.assertEqual(position.get_game_state(), 'UNFINISHED')
+        self.assertEqual(position.position_hash(), game.position_hash())
+        self.assertEqual(position.to_fen(), game.to_fen())
+        self.assertEqual(position.legal_moves(), game.legal_moves())
+        self.assertIs(position.get_piece('e1'), WHITE_KING)
+        self.assertIsNone(position.get_piece('e4'))
+        self.assertIsNone(position.get_piece('z9'))
+
+    def test_invalid_position(self):
+        """
+        Test that Position raises ValueError for invalid squares, colors or game states
+        """
+        for squares in [START_SQUARES[:63], START_SQUARES + b'\x00', b'\x07' + START_SQUARES[1:], 64,
+                        START_SQUARES[:8] + bytes([WHITE | 6]) + START_SQUARES[9:]]:      # two white kings
+            with self.assertRaises(ValueError):
+                Position(squares)
+        with self.assertRaises(ValueError):
+            Position(START_SQUARES, 'red')
+        with self.assertRaises(ValueError):
+            Position(START_SQUARES, 'white', 'DRAW')
+
+    def test_immutable(self):
+        """
+        Test that a Position's attributes cannot be changed or deleted, and copies are the position itself
+        """
+        position = Position()
+        with self.assertRaises(AttributeError):
+            position._color = 'black'
+        with self.assertRaises(AttributeError):
+            position.extra = 1
+        with self.assertRaises(AttributeError):
+            del position._squares
+        self.assertIs(copy.copy(position), position)
+        self.assertIs(copy.deepcopy(position), position)
+
+    def test_play_returns_new_position(self):
+        """
+        Test that play returns the position after the move and leaves the original unchanged
+        """
+        start = Position()
+        after = start.play('e2', 'e4')
+        self.assertEqual(start, Position())
+        self.assertEqual(start.get_current_color(), 'white')
+        self.assertIsNone(start.get_piece('e4'))
+        self.assertEqual(after.get_current_color(), 'black')
+        self.assertIs(after.get_piece('e4'), PIECES[WHITE | 1])
+        self.assertIsNone(after.get_piece('e2'))
+        self.assertNotEqual(after, start)
+
+    def test_play_illegal(self):
+        """
+        Test that play returns None for moves move_made rejects, and check_move gives the same reasons
+        """
+        position = Position()
+        game = ChessVar()
+        for move in [('e2', 'e5'), ('e7', 'e5'), ('z9', 'e4'), ('a1', 'a2'), ('a1', 'a3'), ('e4', 'e5'),
+                     ('e2', 'e2')]:
+            self.assertIsNone(position.play(move[0], move[1]), move)
+            self.assertEqual(position.check_move(move[0], move[1]), game.check_move(move[0], move[1]), move)
+        self.assertEqual(position.check_move('e2', 'e4'), 'OK')
+
+    def test_play_matches_chess_var(self):
+        """
+        Test that a game played with play matches the same game played with move_made,
+        including the hash and the winner
+        """
+        moves = [('e2', 'e4'), ('d7', 'd5'), ('e4', 'd5'), ('e8', 'd7'), ('d1', 'g4'), ('d7', 'd6'),
+                 ('g4', 'g7'), ('d6', 'd5')]
+        position = Position()
+        game = ChessVar()
+        for move in moves:
+            position = position.play(move[0], move[1])
+            self.assertTrue(game.move_made(move[0], move[1]))
+            self.assertEqual(position, Position.from_game(game), move)
+            self.assertEqual(position.position_hash(), zobrist_hash(position.get_squares(),
+                                                                    position.get_current_color()))
+
+        self.assertEqual(position.get_game_state(), 'BLACK_WON')
+        self.assertIsNone(position.play('g7', 'h8'))
+
+    def test_king_capture_wins(self):
+        """
+        Test that capturing the opponent's king with play wins the game
+        """
+        position = Position.from_fen('4k3/8/8/8/8/8/8/4RK2 w')
+        after = position.play('e1', 'e8')
+        self.assertEqual(after.get_game_state(), 'WHITE_WON')
+        self.assertEqual(after, Position.from_game(ChessVar.from_fen(after.to_fen())))
+
+    def test_hashable(self):
+        """
+        Test that equal positions reached by different move orders are equal, hash alike and share a dictionary key
+        """
+        first = Position().play('g1', 'f3').play('b8', 'c6').play('b1', 'c3')
+        second = Position().play('b1', 'c3').play('b8', 'c6').play('g1', 'f3')
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        cache = {first: 'seen'}
+        self.assertEqual(cache[second], 'seen')
+        self.assertEqual(len({Position(), Position(), first, second}), 2)
+        self.assertNotEqual(Position(), Position(START_SQUARES, 'black'))
+        self.assertNotEqual(Position(), Position(START_SQUARES, 'white', 'WHITE_WON'))
+        self.assertNotEqual(Position(), START_SQUARES)
+
+    def test_conversions(self):
+        """
+        Test that a Position converts to and from ChessVar, position strings, snapshots and pickles
+        """
+        game = ChessVar()
+        for move in [('e2', 'e4'), ('d7', 'd5'), ('e1', 'e2')]:
+            self.assertTrue(game.move_made(move[0], move[1]))
+        position = Position.from_game(game)
+
+        for backend in ('array', 'bitboard'):
+            converted = position.to_game(backend)
+            self.assertEqual(converted.get_backend(), backend)
+            self.assertEqual(converted.to_fen(), game.to_fen())
+            self.assertEqual(converted.position_hash(), game.position_hash())
+            self.assertTrue(converted.board_consistent())
+            self.assertFalse(converted.unmake_move())
+
+        self.assertEqual(Position.from_fen(game.to_fen()), position)
+        self.assertEqual(position.snapshot(), game.snapshot())
+        self.assertEqual(Position.restore(game.snapshot()), position)
+        self.assertEqual(pickle.loads(pickle.dumps(position)), position)
+        self.assertEqual(eval(repr(position)), position)
+        self.assertIsNone(Position.from_fen('not a position'))
+        self.assertIsNone(Position.restore(b''))
+
+        # converting does not tie the position to the game
+        self.assertTrue(game.move_made('a7', 'a6'))
+        self.assertEqual(position.to_fen(), 'rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPPKPPP/RNBQ1BNR b UNFINISHED')
+
+
+class TestBitboardBackend(unittest.TestCase):
+    """
+    Test cases for the bitboard move validation backend
+    """
+
+    def test_start_position_moves(self):
+        """
+        Test that each side has 20 moves in the opening position
+        """
+        bitboards = Bitboards(START_SQUARES)
+        self.assertEqual(len(bitboards.generate_moves(WHITE)), 20)
+        self.assertEqual(len(bitboards.generate_moves(BLACK)), 20)
+
+    def test_assignment_example_sequence(self):
+        """
+        Test the assignment example with the bitboard backend
+        """
+        game = ChessVar(backend='bitboard')
+        game.set_debug(True)
+        self.assertEqual(game.get_backend(), 'bitboard')
+        self.assertTrue(game.move_made('d2', 'd4'))
+        self.assertTrue(game.move_made('g7', 'g5'))
+        self.assertTrue(game.move_made('c1', 'g5'))
+        self.assertTrue(game.move_made('e7', 'e6'))
+        self.assertTrue(game.move_made('g5', 'd8'))
+        self.assertEqual(game.get_board()[0], ['r', 'n', 'b', 'B', 'k', 'b', 'n', 'r'])
+
+    def test_backends_agree_on_blocked_moves(self):
+        """
+        Test that both backends reject the same blocked and illegal moves
+        """
+        for backend in ('array', 'bitboard'):
+            game = ChessVar(backend=backend)
+            self.assertFalse(game.move_made('a1', 'a3'))    # rook blocked by pawn
+            self.assertFalse(game.move_made('e2', 'f3'))    # pawn diagonal without capture
+            self.assertTrue(game.move_made('e2', 'e4'))
+            self.assertTrue(game.move_made('e7', 'e5'))
+            self.assertFalse(game.move_made('e4', 'e6'))    # pawn cannot move two squares again
+            self.assertTrue(game.move_made('d1', 'h5'))     # queen along open diagonal
+
+    def test_unknown_backend(self):
+        """
+        Test that an unknown backend name is rejected
+        """
+        with self.assertRaises(ValueError):
+            ChessVar(backend='gpu')
+
+    def test_set_dictionary_updates_bitboards(self):
+        """
+        Test that pieces moved with set_dictionary are seen by the bitboard backend
+        """
+        for backend in ('array', 'bitboard'):
+            game = ChessVar(backend=backend)
+            game.set_dictionary('a2', 'a5')
+            self.assertTrue(game.board_consistent(), backend)
+            self.assertTrue(game.move_made('a1', 'a4'), backend)
+            self.assertFalse(game.move_made('a5', 'a7'), backend)     # black to move
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,21 @@
+# Author: Anastasiya Berst
+# GitHub username: anaberst
+# Description: This program contains games and helpers shared by the unit tests
+
+from chess_var import ChessVar
+
+# white walks the king onto the hill
+KING_WALK = [['e2', 'e4'], ['d7', 'd5'], ['e1', 'e2'], ['a7', 'a6'], ['e2', 'e3'], ['a6', 'a5'], ['e3', 'd4']]
+
+# black captures the white king
+KING_CAPTURE = [['f2', 'f3'], ['e7', 'e5'], ['e1', 'f2'], ['d8', 'h4'], ['a2', 'a3'], ['h4', 'f2']]
+
+
+def play(moves):
+    """
+    Returns a new ChessVar after making the given list of (move from, move to) tuples.
+    """
+    game = ChessVar()
+    for move_from, move_to in moves:
+        assert game.move_made(move_from, move_to)
+    return game